@@ -0,0 +1,98 @@
+# Allocations made by steady-state scribe moves.
+# Run from the solution directory: python -m benchmarks.allocations
+import argparse
+import tracemalloc
+
+from canvases.canvas import Canvas
+from scribes.robotScribe import RobotScribe
+from scribes.terminalScribe import TerminalScribe
+
+
+def diagonalScribe():
+    scribe = TerminalScribe(pos=(0, 0))
+    scribe._setDegrees(135, None)
+    return scribe
+
+
+def straightScribe():
+    scribe = RobotScribe(pos=(0, 0))
+    scribe._setDirection((1, 0), None)
+    return scribe
+
+
+def measure(factory, steps, size):
+    canvas = Canvas(size, size, scribes=[])
+    scribe = factory()
+    # Warm up so every cell has been written and caches are filled
+    for i in range(4 * size):
+        scribe._forward(canvas)
+
+    tracemalloc.start()
+    overhead = min(peakDuring(noop, canvas) for i in range(100))
+    allocating = 0
+    bounces = 0
+    transient = 0
+    start, _ = tracemalloc.get_traced_memory()
+    for i in range(steps):
+        # Keep the previous position, direction and cell glyph alive so that a
+        # move replacing them with new objects can't hide behind their release
+        pos = scribe.pos
+        direction = scribe.direction
+        held = (pos, direction, canvas._canvas[round(pos[0])][round(pos[1])])
+        allocated = peakDuring(scribe._forward, canvas) - overhead
+        # Wall bounces are allowed to allocate; ordinary moves are not
+        if scribe.direction != direction:
+            bounces += 1
+        elif allocated > 0:
+            allocating += 1
+        transient += max(allocated, 0)
+        del held
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'bounces': bounces,
+        'allocating_moves': allocating,
+        'transient_bytes_per_move': transient / steps,
+        'retained_bytes_per_move': (end - start) / steps,
+    }
+
+
+def noop(canvas):
+    pass
+
+
+# Bytes allocated on top of the current traced memory while running func.
+# Peak traced memory is reset first, so allocations freed again before func
+# returns are still counted.
+def peakDuring(func, *args):
+    started = tracemalloc.is_tracing()
+    if not started:
+        tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    if not started:
+        tracemalloc.stop()
+    return peak - before
+
+
+def main(steps, size):
+    results = {
+        'diagonal': measure(diagonalScribe, steps, size),
+        'straight': measure(straightScribe, steps, size),
+    }
+    print(f'Allocations over {steps} moves on a {size}x{size} canvas')
+    for name, result in results.items():
+        print(f"{name:<10}{result['bounces']:>8} bounces{result['allocating_moves']:>8} allocating moves"
+              f"{result['transient_bytes_per_move']:>10.2f} transient bytes/move"
+              f"{result['retained_bytes_per_move']:>10.2f} retained bytes/move")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--steps', type=int, default=100000, help='Number of moves to measure')
+    parser.add_argument('-s', '--size', type=int, default=200, help='Canvas width and height')
+    args = parser.parse_args()
+    main(args.steps, args.size)
@@ -0,0 +1,79 @@
+# Checks a Broadcaster on localhost with a fast, a slow and a late client.
+# Run from the solution directory: python -m benchmarks.broadcast
+import argparse
+import json
+import socket
+import threading
+import time
+
+from benchmarks.scenes import makeScene
+from broadcast import Broadcaster, receiveFrames
+from recording import applyFrame
+from renderers.memoryRenderer import MemoryRenderer
+
+
+# Decodes every frame sent over an already connected socket
+def readFrames(connection, frames):
+    rows = None
+    with connection, connection.makefile('rb') as stream:
+        for line in stream:
+            seconds, kind, data = json.loads(line)
+            rows = applyFrame(rows, kind, data)
+            frames.append('\n'.join(rows))
+
+
+def main(width, height, scribes, moves, maxBuffer):
+    canvas = makeScene(width, height, scribes, moves)
+    canvas.renderer = MemoryRenderer()
+    broadcaster = Broadcaster(0, keyframeInterval=20, maxBuffer=maxBuffer)
+    canvas.frameListeners.append(broadcaster)
+
+    fast = []
+    fastReader = threading.Thread(target=lambda: fast.extend(receiveFrames('127.0.0.1', broadcaster.port)))
+    fastReader.start()
+    # A small receive buffer, set before connecting, and nobody reading
+    # until the run is over makes this client fall behind
+    slowConnection = socket.socket()
+    slowConnection.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    slowConnection.connect(('127.0.0.1', broadcaster.port))
+    while broadcaster.clientCount() < 2:
+        time.sleep(0.01)
+
+    canvas.go()
+    frames = list(canvas.renderer.frames)
+    slow = []
+    slowReader = threading.Thread(target=readFrames, args=(slowConnection, slow))
+    slowReader.start()
+    # The slow client is caught up once its buffer drains, without waiting
+    # for another frame
+    deadline = time.perf_counter() + 5
+    while (not slow or slow[-1] != frames[-1]) and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    late = next(receiveFrames('127.0.0.1', broadcaster.port))
+    broadcaster.close()
+    fastReader.join()
+    slowReader.join()
+
+    checks = {
+        'fast client got every frame': fast == frames,
+        'slow client was skipped': broadcaster.skipped > 0,
+        'slow client only saw real frames': all(frame in frames for frame in slow),
+        'slow client caught up': bool(slow) and slow[-1] == frames[-1],
+        'late client got the current frame': late == frames[-1],
+    }
+    print(f'{len(frames)} frames, fast client {len(fast)}, slow client {len(slow)}, {broadcaster.skipped} skipped')
+    for name, passed in checks.items():
+        print(f'{name:<36}{"ok" if passed else "FAILED"}')
+    return all(checks.values())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-W', '--width', type=int, default=200, help='Canvas width')
+    parser.add_argument('-H', '--height', type=int, default=100, help='Canvas height')
+    parser.add_argument('-n', '--scribes', type=int, default=20, help='Number of scribes')
+    parser.add_argument('-m', '--moves', type=int, default=400, help='Moves per scribe')
+    parser.add_argument('--max-buffer', type=int, default=64 * 1024, metavar='BYTES', help='Broadcaster maxBuffer')
+    args = parser.parse_args()
+    if not main(args.width, args.height, args.scribes, args.moves, args.max_buffer):
+        raise SystemExit(1)
@@ -0,0 +1,124 @@
+# Throughput of the scribe engine: ticking, rendering and saving/loading.
+# Run from the solution directory: python -m benchmarks.engine
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.scenes import makeScene
+from canvases.canvas import Canvas
+from canvases.canvasAxis import CanvasAxis
+from renderers.terminalRenderer import TerminalRenderer
+
+# Classes fromFile may need to look up by name
+from scribes.plotScribe import PlotScribe
+from scribes.randomScribe import RandomWalkScribe
+from scribes.robotScribe import RobotScribe
+from scribes.terminalScribe import TerminalScribe
+
+CLASSES = {cls.__name__: cls for cls in (Canvas, CanvasAxis, PlotScribe, RandomWalkScribe, RobotScribe, TerminalScribe)}
+
+
+# Best wall-clock time of repeat calls to func. With setup, each call gets
+# a fresh setup() result as its argument and setup itself is not timed.
+def best(func, repeat=3, setup=None):
+    times = []
+    for i in range(repeat):
+        args = () if setup is None else (setup(),)
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+# Headless Canvas.go: every tick, no printing or sleeping
+def tickThroughput(scribeCounts=(1, 10, 100), sizes=(40, 200), moves=500):
+    results = []
+    for size in sizes:
+        for scribes in scribeCounts:
+            def run(canvas):
+                for i in range(canvas.ticks()):
+                    canvas.tick(i)
+            scene = makeScene(size, size, scribes, moves)
+            seconds = best(run, setup=lambda: makeScene(size, size, scribes, moves))
+            results.append({
+                'size': size,
+                'scribes': scribes,
+                'ticks_per_second': scene.ticks() / seconds,
+                'moves_per_second': sum(len(scribe.moves) for scribe in scene.scribes) / seconds,
+            })
+    return results
+
+
+# render() plus writing the frame through a TerminalRenderer on os.devnull,
+# with the terminal clear left out
+def renderCost(sizes=(40, 200), frames=20):
+    results = []
+    with open(os.devnull, 'w') as devnull:
+        for size in sizes:
+            for canvasClass in (Canvas, CanvasAxis):
+                canvas = makeScene(size, size, 10, 200, canvasClass=canvasClass)
+                canvas.renderer = TerminalRenderer(devnull)
+                for i in range(canvas.ticks()):
+                    canvas.tick(i)
+                def render():
+                    for i in range(frames):
+                        canvas.write(canvas.render())
+                results.append({
+                    'size': size,
+                    'canvas': canvasClass.__name__,
+                    'ms_per_frame': best(render) / frames * 1000,
+                })
+    return results
+
+
+# toFile/fromFile round trips against scene size
+def fileThroughput(sizes=(40, 200), scribeCounts=(10, 100), moves=500):
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        name = os.path.join(directory, 'scene')
+        for size in sizes:
+            for scribes in scribeCounts:
+                canvas = makeScene(size, size, scribes, moves)
+                saveSeconds = best(lambda: canvas.toFile(name))
+                loadSeconds = best(lambda: Canvas.fromFile(name, CLASSES))
+                megabytes = os.path.getsize(name + '.json') / 1e6
+                results.append({
+                    'size': size,
+                    'scribes': scribes,
+                    'megabytes': megabytes,
+                    'save_mb_per_second': megabytes / saveSeconds,
+                    'load_mb_per_second': megabytes / loadSeconds,
+                })
+    return results
+
+
+# Rebinding saved move names to methods, the per-scribe part of fromDict
+def movesFromDict(moveCounts=(100, 1000, 10000), scribes=20):
+    results = []
+    for moves in moveCounts:
+        canvas = makeScene(40, 40, scribes, moves)
+        saved = [scribe.toDict() for scribe in canvas.scribes]
+        def load():
+            for scribe, data in zip(canvas.scribes, saved):
+                scribe._movesFromDict(data['moves'])
+        seconds = best(load)
+        total = sum(len(data['moves']) for data in saved)
+        results.append({
+            'moves': total,
+            'ms': seconds * 1000,
+            'moves_per_second': total / seconds,
+        })
+    return results
+
+
+SUITES = {
+    'ticks': tickThroughput,
+    'render': renderCost,
+    'files': fileThroughput,
+    'movesFromDict': movesFromDict,
+}
+
+
+if __name__ == '__main__':
+    print(json.dumps({name: suite() for name, suite in SUITES.items()}, indent=2))
@@ -0,0 +1,49 @@
+# Per-object footprint of idle scribes and canvases.
+# Run from the solution directory: python -m benchmarks.memory
+import argparse
+import gc
+import tracemalloc
+
+from canvases.canvas import Canvas
+from scribes.plotScribe import PlotScribe
+from scribes.randomScribe import RandomWalkScribe
+from scribes.robotScribe import RobotScribe
+from scribes.terminalScribe import TerminalScribe
+
+FACTORIES = {
+    'TerminalScribe': lambda: TerminalScribe(),
+    'PlotScribe': lambda: PlotScribe(domain=(0, 40)),
+    'RobotScribe': lambda: RobotScribe(),
+    'RandomWalkScribe': lambda: RandomWalkScribe(),
+    'Canvas': lambda: Canvas(0, 0, scribes=[]),
+}
+
+
+def footprint(factory, count):
+    gc.collect()
+    tracemalloc.start()
+    objects = [factory() for i in range(count)]
+    # Idle scribes have run their initial setDegrees move
+    for obj in objects:
+        for move in getattr(obj, 'moves', []):
+            move[0](*move[1], None)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Don't charge the objects for the list that holds them
+    size -= 8 * count
+    del objects
+    return size / count
+
+
+def main(count):
+    results = {name: footprint(factory, count) for name, factory in FACTORIES.items()}
+    print(f'Bytes per object ({count} instances)')
+    for name, size in results.items():
+        print(f'{name:<20}{size:>10.1f}')
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--count', type=int, default=100000, help='Number of idle objects to create')
+    main(parser.parse_args().count)
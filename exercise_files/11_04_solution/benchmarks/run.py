@@ -0,0 +1,91 @@
+# Runs the benchmark suites and stores the results as JSON so that runs
+# from different commits can be compared.
+# Run from the solution directory:
+#   python -m benchmarks.run                       (all suites)
+#   python -m benchmarks.run -s ticks -s render    (some suites)
+#   python -m benchmarks.run --compare benchmarks/results/abc1234.json
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+
+from benchmarks import allocations, engine, memory
+
+SUITES = dict(engine.SUITES)
+SUITES['memory'] = lambda: {name: memory.footprint(factory, 100000) for name, factory in memory.FACTORIES.items()}
+SUITES['allocations'] = lambda: {name: allocations.measure(factory, 20000, 200) for name, factory in (('diagonal', allocations.diagonalScribe), ('straight', allocations.straightScribe))}
+
+# Keys that identify a benchmark case rather than measure it
+IDENTITY = ('size', 'scribes', 'canvas', 'moves')
+
+RESULTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def gitCommit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run(names):
+    results = {}
+    for name in names:
+        start = time.perf_counter()
+        results[name] = SUITES[name]()
+        print(f'{name:<16}{time.perf_counter() - start:>8.1f}s')
+    return {
+        'commit': gitCommit(),
+        'python': platform.python_version(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+
+
+# Flattens nested results into {'suite[case].metric': value}
+def flatten(data, prefix=''):
+    if isinstance(data, dict):
+        flat = {}
+        for key, val in data.items():
+            if key not in IDENTITY:
+                flat.update(flatten(val, f'{prefix}.{key}' if prefix else key))
+        return flat
+    if isinstance(data, list):
+        flat = {}
+        for entry in data:
+            case = ','.join(f'{key}={entry[key]}' for key in IDENTITY if key in entry)
+            flat.update(flatten(entry, f'{prefix}[{case}]'))
+        return flat
+    if isinstance(data, (int, float)):
+        return {prefix: data}
+    return {}
+
+
+def compare(old, new):
+    before, after = flatten(old['results']), flatten(new['results'])
+    print(f'{old["commit"]} -> {new["commit"]}')
+    for key in before:
+        if key in after and before[key]:
+            change = (after[key] - before[key]) / before[key]
+            print(f'{key:<60}{before[key]:>14.4g}{after[key]:>14.4g}{change:>+9.1%}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-s', '--suite', action='append', choices=list(SUITES), help='Suite to run (repeatable, default: all)')
+    parser.add_argument('-o', '--output', help='Results file (default: benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', help='Earlier results file to compare against')
+    args = parser.parse_args()
+
+    data = run(args.suite or list(SUITES))
+    output = args.output or os.path.join(RESULTS, data['commit'] + '.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        f.write(json.dumps(data, indent=2))
+    print(f'Saved {output}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), data)
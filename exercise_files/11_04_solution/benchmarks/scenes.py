@@ -0,0 +1,54 @@
+# Synthetic scenes for the benchmarks.
+# Run from the solution directory to save one as a Scribe file:
+#   python -m benchmarks.scenes -o scene -W 80 -H 40 -s 20 -m 500
+import argparse
+import random
+
+from canvases.canvas import Canvas
+from canvases.canvasAxis import CanvasAxis
+from scribes.plotScribe import PlotScribe
+from scribes.randomScribe import RandomWalkScribe
+from scribes.robotScribe import RobotScribe
+from scribes.terminalScribe import TerminalScribe
+
+COLORS = ('red', 'green', 'yellow', 'blue', 'magenta', 'cyan')
+
+
+# A canvas with scribes of every kind, each with roughly moves moves.
+# The same arguments always build the same scene.
+def makeScene(width, height, scribes, moves, seed=0, canvasClass=Canvas):
+    rng = random.Random(seed)
+    made = []
+    for i in range(scribes):
+        color = COLORS[i % len(COLORS)]
+        pos = (rng.randrange(width), rng.randrange(height))
+        kind = i % 4
+        if kind == 0:
+            scribe = TerminalScribe(color=color, pos=pos, degrees=rng.randrange(360))
+            scribe.forward(moves - 1)
+        elif kind == 1:
+            scribe = RobotScribe(color=color, pos=pos)
+            side = max(moves // 4 - 1, 1)
+            for direction in (scribe.right, scribe.down, scribe.left, scribe.up):
+                direction(side)
+        elif kind == 2:
+            scribe = RandomWalkScribe(color=color, pos=pos, seed=seed * 1000 + i)
+            scribe.forward(moves // 2)
+        else:
+            scribe = PlotScribe(domain=(0, min(moves, width)), color=color)
+            scribe.plotX(f'{height / 4}*sin(x/{rng.randint(2, 8)}) + {height / 2}')
+        made.append(scribe)
+    return canvasClass(width, height, scribes=made, framerate=0)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-o', '--output', required=True, help='Scribe file to write (.json is added)')
+    parser.add_argument('-W', '--width', type=int, default=80)
+    parser.add_argument('-H', '--height', type=int, default=40)
+    parser.add_argument('-s', '--scribes', type=int, default=20)
+    parser.add_argument('-m', '--moves', type=int, default=500, help='Moves per scribe')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--axis', action='store_true', help='Use a CanvasAxis')
+    args = parser.parse_args()
+    makeScene(args.width, args.height, args.scribes, args.moves, args.seed, CanvasAxis if args.axis else Canvas).toFile(args.output)
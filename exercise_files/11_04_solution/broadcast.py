@@ -0,0 +1,139 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+
+from recording import applyFrame, frameDelta, frameLine
+
+
+# A Canvas frame listener that streams frames to every client connected to
+# host:port, as the JSON lines of a recording (see recording.py). Each
+# frame is encoded once, as a delta against the one before, and the same
+# bytes go to every client. The server runs on an asyncio event loop in a
+# daemon thread, so the canvas never waits for a client.
+#
+# A client whose unsent data grows past maxBuffer bytes is skipped: it gets
+# nothing more until its buffer has drained, and is then sent the latest
+# keyframe and the deltas since straight away. New clients get the same.
+class Broadcaster:
+    def __init__(self, port, host='127.0.0.1', keyframeInterval=50, maxBuffer=1 << 20):
+        self.keyframeInterval = keyframeInterval
+        self.maxBuffer = maxBuffer
+        self.frames = 0
+        self.skipped = 0
+        self._previous = None
+        self._start = None
+        # Only touched on the event loop's thread
+        self._clients = set()
+        self._stale = set()
+        self._resyncs = set()
+        self._recent = []
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self._server = asyncio.run_coroutine_threadsafe(asyncio.start_server(self._serveClient, host, port), self._loop).result()
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    def __call__(self, frame):
+        now = time.perf_counter()
+        if self._start is None:
+            self._start = now
+        seconds = round(now - self._start, 6)
+        rows = frame.split('\n')
+        keyframe = self._previous is None or len(rows) != len(self._previous) or self.frames % self.keyframeInterval == 0
+        if keyframe:
+            line = frameLine(seconds, 'k', rows)
+        else:
+            line = frameLine(seconds, 'd', frameDelta(self._previous, rows))
+        self._previous = rows
+        self.frames += 1
+        self._loop.call_soon_threadsafe(self._send, line, keyframe)
+
+    def _send(self, line, keyframe):
+        if keyframe:
+            self._recent = [line]
+        else:
+            self._recent.append(line)
+        for writer in list(self._clients):
+            if writer.is_closing():
+                self._clients.discard(writer)
+                self._stale.discard(writer)
+                continue
+            lagging = writer.transport.get_write_buffer_size() > self.maxBuffer
+            if writer in self._stale:
+                continue
+            if lagging:
+                self._stale.add(writer)
+                self.skipped += 1
+                resync = asyncio.ensure_future(self._resync(writer))
+                self._resyncs.add(resync)
+                resync.add_done_callback(self._resyncs.discard)
+            else:
+                writer.write(line)
+
+    # Catches a skipped client up as soon as its buffer has drained
+    async def _resync(self, writer):
+        try:
+            await writer.drain()
+        except ConnectionError:
+            return
+        if writer in self._stale and not writer.is_closing():
+            self._stale.discard(writer)
+            writer.write(b''.join(self._recent))
+
+    async def _serveClient(self, reader, writer):
+        writer.write(b''.join(self._recent))
+        self._clients.add(writer)
+        try:
+            # Clients send nothing; this returns when they disconnect
+            while await reader.read(1024):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            self._clients.discard(writer)
+            self._stale.discard(writer)
+            writer.close()
+
+    def clientCount(self):
+        return len(self._clients)
+
+    # Clients get what is buffered for them, except lagging ones, which
+    # are dropped rather than waited for (and so is anyone still not done
+    # after timeout seconds)
+    async def _shutdown(self, timeout):
+        self._server.close()
+        for resync in list(self._resyncs):
+            resync.cancel()
+        for writer in self._clients:
+            if writer.transport.get_write_buffer_size() > self.maxBuffer:
+                writer.transport.abort()
+            else:
+                writer.close()
+        if self._clients:
+            closing = [asyncio.ensure_future(writer.wait_closed()) for writer in self._clients]
+            done, pending = await asyncio.wait(closing, timeout=timeout)
+            for future in pending:
+                future.cancel()
+            for writer in self._clients:
+                writer.transport.abort()
+        await self._server.wait_closed()
+
+    def close(self, timeout=5):
+        asyncio.run_coroutine_threadsafe(self._shutdown(timeout), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+# Yields the text of each frame a Broadcaster at host:port sends, until it
+# closes the connection
+def receiveFrames(host, port):
+    rows = None
+    with socket.create_connection((host, port)) as connection, connection.makefile('rb') as stream:
+        for line in stream:
+            seconds, kind, data = json.loads(line)
+            rows = applyFrame(rows, kind, data)
+            yield '\n'.join(rows)
@@ -1,13 +1,60 @@
-import os
+import copy
 import time
-from threading import Thread
 import json 
+from itertools import repeat
+from operator import eq
+from termcolor import colored
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 from errors import TerminalScribeException, InvalidParameter
-from utils import is_number 
+from raster import fold
+from renderers.terminalRenderer import TerminalRenderer
+from canvases.pyramid import Pyramid, SUMMARIES
+from canvases.snapshot import Snapshot
+from canvases.viewport import screenSize
+from journal import replayJournal
+from utils import is_number, cell_index
+
+# Glyphs for the density render mode, from least to most visited
+SHADES = ' .:-=+*#%@'
+
+# What setCell does with a cell outside the canvas
+BOUNDARIES = ('raise', 'clip', 'wrap', 'ignore')
+
+# Whether the distance between scribes a and b is shrinking. Scribes on
+# exactly the same point are approaching when they head in opposing
+# directions.
+def approaching(a, b):
+    dx, dy = b._px - a._px, b._py - a._py
+    if dx == 0 and dy == 0:
+        return a._dx * b._dx + a._dy * b._dy < 0
+    return dx * (b._dx - a._dx) + dy * (b._dy - a._dy) < 0
 
 class Canvas:
-    def __init__(self, width, height, scribes=[], framerate=.05):
+    # Cells and lines that render() adds around the grid
+    MARGIN = (0, 0)
+
+    __slots__ = ('_x', '_y', '_canvas', 'scribes', 'framerate', 'renderMode', '_visits', 'visitedCells', 'topVisits', '_occupants', 'collisions', 'boundary', 'profiler', 'metrics', 'frameListeners', 'renderer', 'viewport', 'pyramid', 'overview', 'watchers', 'nextTick', '_owned', 'changedVisits')
+
+    # With heatmap=True the canvas also counts how many ticks scribes have
+    # spent in each cell. renderMode 'density' prints those counts as shades
+    # instead of the cell glyphs.
+    # With spatialIndex=True the canvas keeps a per-tick index of which
+    # scribes are in which cell, and with collisions=True scribes that end
+    # a tick in the same cell bounce off each other.
+    # boundary is one of BOUNDARIES: writes outside the canvas raise a
+    # TerminalScribeException, are clipped to the nearest edge cell, wrap
+    # around to the opposite edge, or are dropped.
+    # renderer is where frames go, a renderers.Renderer that defaults to a
+    # TerminalRenderer.
+    # With lod=True the canvas keeps a canvases.pyramid.Pyramid of
+    # downsampled summaries, which setting overview to one of SUMMARIES
+    # renders instead of the cells.
+    def __init__(self, width, height, scribes=[], framerate=.05, heatmap=False, renderMode='glyph', spatialIndex=False, collisions=False, boundary='raise', renderer=None, lod=False):
         if not is_number(width):
             raise InvalidParameter('Width must be a number')
         self._x = width
@@ -21,66 +68,508 @@ class Canvas:
             raise InvalidParameter('Framerate must be a number')
         self.framerate = framerate
 
+        if boundary not in BOUNDARIES:
+            raise InvalidParameter(f'Boundary must be one of {", ".join(BOUNDARIES)}')
+        self.boundary = boundary
+
+        if renderMode not in ('glyph', 'density'):
+            raise InvalidParameter('Render mode must be "glyph" or "density"')
+        self.renderMode = renderMode
+        self._visits = None
+        self.visitedCells = 0
+        self.topVisits = 0
+        if heatmap or renderMode == 'density':
+            self.resetVisits()
+        # A set of the cells whose visit counts have changed, kept only
+        # while a journal.Journal needs it
+        self.changedVisits = None
+
+        # A profiling.Profiler set here makes go() record per-phase timings
+        self.profiler = None
+        # A metrics.Metrics set here makes go() keep live counters
+        self.metrics = None
+        # Callables given every frame go() writes, such as a
+        # recording.Recorder
+        self.frameListeners = []
+        self.renderer = renderer or TerminalRenderer()
+        # A canvases.viewport.Viewport set here makes render() show only
+        # part of the canvas
+        self.viewport = None
+
+        # Objects told about every write, through touch(cx, cy, mark) for
+        # single cells and touchRect(x0, y0, x1, y1, mark) for bulk writes
+        # (mark is None when the glyphs vary): the pyramid and any
+        # journal.Journal
+        self.watchers = []
+        # The tick go() runs next, so that a loaded canvas carries on where
+        # it was saved
+        self.nextTick = 0
+        # Columns this canvas may write in place since its last snapshot,
+        # or None when no snapshot shares any of them
+        self._owned = None
+        self.overview = None
+        self.pyramid = None
+        if lod:
+            self.buildPyramid()
+
+        self.collisions = collisions
+        self._occupants = None
+        if spatialIndex or collisions:
+            self.indexScribes()
+
     def toDict(self):
-        return {
+        data = {
             'classname': type(self).__name__,
             'x': self._x,
             'y': self._y,
             'canvas': self._canvas,
+            'boundary': self.boundary,
+            'renderMode': self.renderMode,
+            'heatmap': self._visits is not None,
+            'tick': self.nextTick,
             'scribes': [scribe.toDict() for scribe in self.scribes]
         }
+        if self._visits is not None:
+            data['visits'] = self._visits
+        return data
 
     def fromDict(data, g):
-        canvas = g[data.get('classname')](data.get('x'), data.get('y'), scribes=[g[scribe.get('classname')].fromDict(scribe, g) for scribe in data.get('scribes')])
+        canvas = g[data.get('classname')](data.get('x'), data.get('y'), scribes=[g[scribe.get('classname')].fromDict(scribe, g) for scribe in data.get('scribes')], boundary=data.get('boundary', 'raise'), heatmap=data.get('heatmap', data.get('visits') is not None), renderMode=data.get('renderMode', 'glyph'))
         canvas._canvas = data.get('canvas')
+        canvas.nextTick = data.get('tick', 0)
+        for scribe, scribeData in zip(canvas.scribes, data.get('scribes')):
+            if scribeData.get('state') is not None:
+                scribe.setRunState(scribeData['state'])
+        if data.get('visits') is not None:
+            canvas._visits = data.get('visits')
+            canvas.visitedCells = sum(count > 0 for column in canvas._visits for count in column)
+            canvas.topVisits = max(map(max, canvas._visits), default=0)
         return canvas
 
     def toFile(self, name):
         with open(name+'.json', 'w') as f:
             f.write(json.dumps(self.toDict()))
 
+    # Includes whatever a journal.Journal has saved since name.json
     def fromFile(name, g):
         with open(name+'.json', 'r') as f:
             try:
-                return Canvas.fromDict(json.loads(f.readline()), g)
+                data = json.loads(f.readline())
+                canvas = Canvas.fromDict(data, g)
             except:
                 raise TerminalScribeException('File {}.json is not a valid Scribe file'.format(name))
+        replayJournal(canvas, name, data.get('generation'))
+        return canvas
+
+    # Fused bounds check on an already rounded cell
+    def hitsWallCell(self, cx, cy):
+        return not (0 <= cx < self._x and 0 <= cy < self._y)
 
     def hitsVerticalWall(self, point):
-        return round(point[0]) < 0 or round(point[0]) >= self._x
+        return not 0 <= cell_index(point[0]) < self._x
 
     def hitsHorizontalWall(self, point):
-        return round(point[1]) < 0 or round(point[1]) >= self._y
+        return not 0 <= cell_index(point[1]) < self._y
 
     def hitsWall(self, point):
-        return self.hitsVerticalWall(point) or self.hitsHorizontalWall(point)
+        return self.hitsWallCell(cell_index(point[0]), cell_index(point[1]))
 
     def getReflection(self, point):
-        return [-1 if self.hitsVerticalWall(point) else 1, -1 if self.hitsHorizontalWall(point) else 1]
+        return (-1 if self.hitsVerticalWall(point) else 1, -1 if self.hitsHorizontalWall(point) else 1)
+
+    # Where a point outside the canvas ends up after bouncing off the walls,
+    # and whether each direction component is reversed on the way
+    def foldPoint(self, x, y):
+        x, flipX = fold(x, self._x)
+        y, flipY = fold(y, self._y)
+        return x, y, flipX, flipY
+
+    # In-bounds writes take a single chained comparison; only writes outside
+    # the canvas go through the boundary policy
+    def setCell(self, cx, cy, mark):
+        if not (0 <= cx < self._x and 0 <= cy < self._y):
+            if self.boundary == 'wrap':
+                cx, cy = cx % self._x, cy % self._y
+            elif self.boundary == 'clip':
+                cx, cy = min(max(cx, 0), self._x - 1), min(max(cy, 0), self._y - 1)
+            elif self.boundary == 'raise':
+                raise TerminalScribeException(f'Cell ({cx}, {cy}) is outside the {self._x}x{self._y} canvas')
+            else:
+                return
+        if self._owned is not None and cx not in self._owned:
+            self._ownColumn(cx)
+        self._canvas[cx][cy] = mark
+        if self.watchers:
+            for watcher in self.watchers:
+                watcher.touch(cx, cy, mark)
 
     def setPos(self, pos, mark):
-        try:
-            self._canvas[round(pos[0])][round(pos[1])] = mark
-        except Exception as e:
-            raise TerminalScribeException(e)
+        self.setCell(cell_index(pos[0]), cell_index(pos[1]), mark)
+
+    # Copy on write: a snapshot shares the canvas's columns, so each column
+    # is copied before the canvas first writes to it afterwards
+    def _ownColumn(self, cx):
+        self._canvas[cx] = self._canvas[cx][:]
+        self._owned.add(cx)
+        if len(self._owned) == self._x:
+            self._owned = None
+
+    def _ownColumns(self, x0, x1):
+        for cx in range(x0, x1):
+            if self._owned is None:
+                return
+            if cx not in self._owned:
+                self._ownColumn(cx)
+
+    def _touchRect(self, x0, y0, x1, y1, mark):
+        for watcher in self.watchers:
+            watcher.touchRect(x0, y0, x1, y1, mark)
+
+    # Bulk drawing primitives. Corners are inclusive cell coordinates in any
+    # order, and anything outside the canvas is clipped. Columns are written
+    # with slice assignment rather than cell by cell. A range entirely off
+    # the canvas clips to an empty one, so no slice ever shrinks a column.
+    def _clip(self, a, b, size):
+        if a > b:
+            a, b = b, a
+        lo = min(max(a, 0), size)
+        return lo, max(min(b, size - 1) + 1, lo)
+
+    def hline(self, x0, x1, y, mark):
+        if 0 <= y < self._y:
+            x0, x1 = self._clip(x0, x1, self._x)
+            self._ownColumns(x0, x1)
+            for column in self._canvas[x0:x1]:
+                column[y] = mark
+            self._touchRect(x0, y, x1, y + 1, mark)
+
+    def vline(self, x, y0, y1, mark):
+        if 0 <= x < self._x:
+            y0, y1 = self._clip(y0, y1, self._y)
+            self._ownColumns(x, x + 1)
+            self._canvas[x][y0:y1] = [mark] * max(y1 - y0, 0)
+            self._touchRect(x, y0, x + 1, y1, mark)
+
+    def fillRect(self, x0, y0, x1, y1, mark):
+        x0, x1 = self._clip(x0, x1, self._x)
+        y0, y1 = self._clip(y0, y1, self._y)
+        cells = [mark] * max(y1 - y0, 0)
+        self._ownColumns(x0, x1)
+        for column in self._canvas[x0:x1]:
+            column[y0:y1] = cells
+        self._touchRect(x0, y0, x1, y1, mark)
+
+    def strokeRect(self, x0, y0, x1, y1, mark):
+        self.hline(x0, x1, y0, mark)
+        self.hline(x0, x1, y1, mark)
+        self.vline(x0, y0, y1, mark)
+        self.vline(x1, y0, y1, mark)
+
+    # Copies a sprite (a list of rows, each a string or a list of glyphs)
+    # with its top left corner at (x, y). Glyphs equal to transparent, and
+    # the missing end of short rows, leave the canvas unchanged.
+    def blit(self, x, y, sprite, transparent=None):
+        width = max((len(row) for row in sprite), default=0)
+        if width == 0:
+            return
+        x0, x1 = self._clip(x, x + width - 1, self._x)
+        y0, y1 = self._clip(y, y + len(sprite) - 1, self._y)
+        rows = sprite[y0 - y:y1 - y]
+        self._ownColumns(x0, x1)
+        for cx in range(x0, x1):
+            column = self._canvas[cx]
+            i = cx - x
+            if transparent is None and all(i < len(row) for row in rows):
+                column[y0:y1] = [row[i] for row in rows]
+            else:
+                for cy, row in enumerate(rows, y0):
+                    if i < len(row) and row[i] != transparent:
+                        column[cy] = row[i]
+        self._touchRect(x0, y0, x1, y1, None)
+
+    # Scanline fill of the region of identical glyphs around pos. Works on
+    # vertical spans: each column gets a boolean mask of cells still to be
+    # filled, and runs are found with list.index on the mask so the Python
+    # loop runs once per span rather than once per cell.
+    # Returns the number of cells filled.
+    def floodFill(self, pos, mark, color=None):
+        x, y = cell_index(pos[0]), cell_index(pos[1])
+        if self.hitsWallCell(x, y):
+            return 0
+        if color is not None:
+            mark = colored(mark, color)
+        target = self._canvas[x][y]
+        if target == mark:
+            return 0
+
+        masks = {}
+        def mask(cx):
+            if cx not in masks:
+                masks[cx] = list(map(eq, self._canvas[cx], repeat(target, self._y)))
+            return masks[cx]
+
+        filled = 0
+        stack = [(x, y)]
+        while stack:
+            x, y = stack.pop()
+            column = mask(x)
+            if not column[y]:
+                continue
+            try:
+                top = y + 1 - column[y::-1].index(False)
+            except ValueError:
+                top = 0
+            try:
+                bottom = column.index(False, y)
+            except ValueError:
+                bottom = self._y
+            column[top:bottom] = [False] * (bottom - top)
+            self._ownColumns(x, x + 1)
+            self._canvas[x][top:bottom] = [mark] * (bottom - top)
+            filled += bottom - top
+            self._touchRect(x, top, x + 1, bottom, mark)
+
+            for nx in (x - 1, x + 1):
+                if not 0 <= nx < self._x:
+                    continue
+                neighbor = mask(nx)
+                ny = top
+                # One seed per run of fillable cells alongside the span
+                while ny < bottom:
+                    try:
+                        ny = neighbor.index(True, ny, bottom)
+                    except ValueError:
+                        break
+                    stack.append((nx, ny))
+                    try:
+                        ny = neighbor.index(False, ny, bottom)
+                    except ValueError:
+                        break
+        return filled
+
+    # A version of the canvas to restore() or branch() from later. Taking one
+    # costs a reference per column: the snapshot shares the columns, and the
+    # canvas copies a column only when it next writes to it. Snapshots hold
+    # the cells, the next tick and the scribes' run states, not the heatmap.
+    def snapshot(self):
+        self._owned = set()
+        return Snapshot(tuple(self._canvas), self._x, self._y, self.nextTick, [scribe.runState() for scribe in self.scribes])
+
+    def restore(self, snapshot):
+        if (snapshot.width, snapshot.height, len(snapshot.scribes)) != (self._x, self._y, len(self.scribes)):
+            raise InvalidParameter('Snapshot is of a different scene')
+        self._canvas = list(snapshot.columns)
+        self._owned = set()
+        self.nextTick = snapshot.tick
+        for scribe, state in zip(self.scribes, snapshot.scribes):
+            scribe.setRunState(state)
+        self._touchRect(0, 0, self._x, self._y, None)
+
+    # A new canvas that carries on from snapshot with copies of this canvas's
+    # scribes, sharing cells with the snapshot until either side changes
+    # them. Listeners, journals and profiling are not carried over.
+    def branch(self, snapshot):
+        canvas = copy.copy(self)
+        canvas.scribes = [scribe.clone() for scribe in self.scribes]
+        canvas.watchers = []
+        canvas.frameListeners = []
+        canvas.profiler = None
+        canvas.metrics = None
+        canvas.viewport = None
+        if self._visits is not None:
+            canvas._visits = [column[:] for column in self._visits]
+        canvas.restore(snapshot)
+        if self.pyramid is not None:
+            canvas.pyramid = None
+            canvas.buildPyramid()
+        if canvas._occupants is not None:
+            canvas.indexScribes()
+        return canvas
 
     def clear(self):
-        os.system('cls' if os.name == 'nt' else 'clear')
+        self.renderer.clear()
+
+    def ticks(self):
+        return max([len(scribe.moves) for scribe in self.scribes], default=0)
+
+    # Runs every scribe's i-th move. While profiling, each move goes through
+    # the profiler's runMove hook so it is timed.
+    def tick(self, i):
+        profiler = self.profiler
+        for index, scribe in enumerate(self.scribes):
+            if len(scribe.moves) > i:
+                move = scribe.moves[i]
+                if profiler is None:
+                    move[0](*move[1], self)
+                else:
+                    profiler.runMove(index, scribe, move, self)
+        self.nextTick = i + 1
+        self.settle()
+
+    # Bookkeeping once every scribe has moved
+    def settle(self):
+        if self._occupants is not None:
+            self.indexScribes()
+            if self.collisions:
+                self.collide()
+        if self._visits is not None:
+            self.countVisits()
+
+    # Uniform grid hash of scribe positions: cell -> scribes in that cell
+    def indexScribes(self):
+        occupants = {}
+        for scribe in self.scribes:
+            cell = (scribe._cx, scribe._cy)
+            if cell in occupants:
+                occupants[cell].append(scribe)
+            else:
+                occupants[cell] = [scribe]
+        self._occupants = occupants
+
+    def occupantsAt(self, cell):
+        if self._occupants is None:
+            raise TerminalScribeException('The spatial index is not enabled on this canvas')
+        return self._occupants.get((cell[0], cell[1]), [])
+
+    # Scribes within radius cells of cell (a square neighborhood)
+    def neighbors(self, cell, radius=1):
+        if self._occupants is None:
+            raise TerminalScribeException('The spatial index is not enabled on this canvas')
+        found = []
+        for x in range(cell[0] - radius, cell[0] + radius + 1):
+            for y in range(cell[1] - radius, cell[1] + radius + 1):
+                found.extend(self._occupants.get((x, y), ()))
+        return found
+
+    # Scribes sharing a cell that are moving towards each other reverse
+    # direction, through the same reflection logic as a wall bounce.
+    # Scribes travelling together, or already moving apart, carry on. Only
+    # the shared cells are visited, not every pair of scribes.
+    def collide(self):
+        bouncing = []
+        for scribes in self._occupants.values():
+            if len(scribes) > 1:
+                bouncing.extend(scribe for scribe in scribes if any(approaching(scribe, other) for other in scribes if other is not scribe))
+        for scribe in bouncing:
+            scribe.reflect((-1, -1))
+
+    def resetVisits(self):
+        self._visits = [[0] * self._y for x in range(self._x)]
+        self.visitedCells = 0
+        self.topVisits = 0
+
+    # Adds one visit to the cell under each scribe
+    def countVisits(self):
+        visits = self._visits
+        changed = self.changedVisits
+        for scribe in self.scribes:
+            cx, cy = scribe._cx, scribe._cy
+            if 0 <= cx < self._x and 0 <= cy < self._y:
+                column = visits[cx]
+                count = column[cy] + 1
+                if count == 1:
+                    self.visitedCells += 1
+                if count > self.topVisits:
+                    self.topVisits = count
+                column[cy] = count
+                if changed is not None:
+                    changed.add((cx, cy))
+
+    # Visit counts indexed [x][y], as a NumPy array when NumPy is installed
+    def visitCounts(self):
+        if self._visits is None:
+            raise TerminalScribeException('Visit counting is not enabled on this canvas')
+        if np is not None:
+            return np.array(self._visits, dtype=np.int64).reshape(self._x, self._y)
+        return [column[:] for column in self._visits]
+
+    # Shades are scaled to the most visited cell on the whole canvas, but
+    # only columns x0 to x1 are shaded
+    def _densityColumns(self, x0, x1):
+        top = self.topVisits or 1
+        steps = len(SHADES) - 1
+        # Rounded up in integers, so any visit at all shows up as at least
+        # the lightest shade
+        return [[SHADES[-(-count * steps // top)] for count in column] for column in self._visits[x0:x1]]
+
+    # The columns of glyphs to print for the current render mode, from
+    # column x0 up to (not including) x1
+    def displayColumns(self, x0=0, x1=None):
+        if self.renderMode == 'density':
+            return self._densityColumns(x0, x1)
+        if x0 == 0 and x1 is None:
+            return self._canvas
+        return self._canvas[x0:x1]
+
+    # Starts keeping a level-of-detail pyramid, built from the current cells
+    # on its first read
+    def buildPyramid(self):
+        if self.pyramid is not None:
+            self.watchers.remove(self.pyramid)
+        self.pyramid = Pyramid(self)
+        self.watchers.append(self.pyramid)
+
+    # The glyph columns to render, the rows of them to show, and the canvas
+    # x and y coordinates those columns and rows start at. That is a crop of
+    # the canvas, or with overview set a pyramid level small enough to fit
+    # the viewport or the terminal.
+    def frameCells(self):
+        if self.overview is not None:
+            if self.pyramid is None:
+                raise TerminalScribeException('Level of detail is not enabled on this canvas')
+            if self.overview not in SUMMARIES:
+                raise InvalidParameter(f'Overview must be one of {", ".join(SUMMARIES)}')
+            width, height = screenSize(self) if self.viewport is None else self.viewport.size(self)
+            k = self.pyramid.levelFor(width, height)
+            columns = self.pyramid.level(k, self.overview)
+            size = 1 << k
+            rows = range(len(columns[0]) if columns else 0)
+            return columns, rows, [bx * size for bx in range(len(columns))], [by * size for by in rows]
+        x0, y0, x1, y1 = self.visibleWindow()
+        return self.displayColumns(x0, x1), range(y0, y1), range(x0, x1), range(y0, y1)
+
+    # (x0, y0, x1, y1) of the cells to render, x1 and y1 exclusive
+    def visibleWindow(self):
+        if self.viewport is None:
+            return 0, 0, self._x, self._y
+        return self.viewport.window(self)
 
     def go(self):
-        max_moves = max([len(scribe.moves) for scribe in self.scribes])
-        for i in range(max_moves):
-            for scribe in self.scribes:
-                threads = []
-                if len(scribe.moves) > i:
-                    args = scribe.moves[i][1]+[self]
-                    threads.append(Thread(target=scribe.moves[i][0], args=args))
-                [thread.start() for thread in threads]
-                [thread.join() for thread in threads]
-            self.print()
-            time.sleep(self.framerate)
+        clock = time.perf_counter
+        profiler, metrics = self.profiler, self.metrics
+        if profiler is not None and profiler.cprofile is not None:
+            profiler.cprofile.enable()
+        try:
+            for i in range(self.nextTick, self.ticks()):
+                start = clock()
+                self.tick(i)
+                ticked = clock()
+                self.clear()
+                cleared = clock()
+                frame = self.render()
+                rendered = clock()
+                self.write(frame)
+                written = clock()
+                if metrics is not None:
+                    metrics.recordRender(rendered - cleared, len(frame.encode()) + 1)
+                    metrics.recordTick(i, written - start, self.framerate, written)
+                time.sleep(self.framerate)
+                if profiler is not None:
+                    profiler.recordTick(ticked - start, cleared - ticked, rendered - cleared, written - rendered, clock() - written)
+        finally:
+            if profiler is not None and profiler.cprofile is not None:
+                profiler.cprofile.disable()
+
+    # The current frame as text
+    def render(self):
+        columns, rows, xs, ys = self.frameCells()
+        return '\n'.join(' '.join([col[y] for col in columns]) for y in rows)
+
+    def write(self, frame):
+        self.renderer.write(frame)
+        for listener in self.frameListeners:
+            listener(frame)
 
     def print(self):
         self.clear()
-        for y in range(self._y):
-            print(' '.join([col[y] for col in self._canvas]))
\ No newline at end of file
+        self.write(self.render())
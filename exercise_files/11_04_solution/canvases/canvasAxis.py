@@ -1,6 +1,10 @@
 from canvases.canvas import Canvas
 
 class CanvasAxis(Canvas):
+    MARGIN = (1, 1)
+
+    __slots__ = ()
+
     # Pads 1-digit numbers with an extra space
     def formatAxisNumber(self, num):
         if num % 5 != 0:
@@ -9,9 +13,8 @@ class CanvasAxis(Canvas):
             return ' '+str(num)
         return str(num)
 
-    def print(self):
-        self.clear()
-        for y in range(self._y):
-            print(self.formatAxisNumber(y) + ' '.join([col[y] for col in self._canvas]))
-
-        print(' '.join([self.formatAxisNumber(x) for x in range(self._x)]))
+    def render(self):
+        columns, rows, xs, ys = self.frameCells()
+        lines = [self.formatAxisNumber(label) + ' '.join([col[y] for col in columns]) for y, label in zip(rows, ys)]
+        lines.append(' '.join([self.formatAxisNumber(x) for x in xs]))
+        return '\n'.join(lines)
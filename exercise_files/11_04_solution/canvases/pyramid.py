@@ -0,0 +1,145 @@
+import math
+from collections import Counter
+
+from errors import InvalidParameter
+
+# The glyph of a cell nothing has been drawn in
+BLANK = ' '
+
+# Summaries an overview can show for each block of cells
+SUMMARIES = ('majority', 'density', 'last')
+
+# Glyphs for the density summary, from emptiest to fullest block
+SHADES = ' .:-=+*#%@'
+
+class Pyramid:
+    __slots__ = ('canvas', 'base', 'top', '_glyphs', '_last', '_stamp', '_dirty', '_clock')
+
+    # Multi-resolution summary of a canvas. Level k splits the canvas into
+    # blocks of 2**k by 2**k cells and keeps, per block, how many times each
+    # non-blank glyph appears and the glyph written there last. Levels go
+    # from base, chosen so that the finest level is at most about 256
+    # blocks across, up to a single block.
+    #
+    # Writes only mark their base block dirty and note the glyph, so drawing
+    # stays cheap. Reading a level first recomputes the dirty base blocks
+    # from the canvas and then their ancestors from their four children, so
+    # a read costs the blocks written since the last read, not the canvas.
+    def __init__(self, canvas, base=None):
+        self.canvas = canvas
+        largest = max(canvas._x, canvas._y, 1)
+        self.base = max(0, math.ceil(math.log2(largest / 256))) if base is None else base
+        self.top = max(self.base, math.ceil(math.log2(largest)))
+        # Per level, lists indexed [bx][by] like the canvas itself
+        self._glyphs = {}
+        self._last = {}
+        self._stamp = {}
+        for k in range(self.base, self.top + 1):
+            width, height = self.blocks(k)
+            self._glyphs[k] = [[None] * height for bx in range(width)]
+            self._last[k] = [[None] * height for bx in range(width)]
+            self._stamp[k] = [[0] * height for bx in range(width)]
+        self._clock = 0
+        self._dirty = set()
+        # A blank canvas needs no first scan
+        if any(column.count(BLANK) != len(column) for column in canvas._canvas):
+            self.touchRect(0, 0, canvas._x, canvas._y, None)
+
+    # Number of blocks across and down at level k
+    def blocks(self, k):
+        size = 1 << k
+        return -(-self.canvas._x // size), -(-self.canvas._y // size)
+
+    def touch(self, cx, cy, mark):
+        bx, by = cx >> self.base, cy >> self.base
+        self._dirty.add((bx, by))
+        if mark != BLANK:
+            self._clock += 1
+            self._last[self.base][bx][by] = mark
+            self._stamp[self.base][bx][by] = self._clock
+
+    # Cells x0 to x1 and y0 to y1 (exclusive) were written, all with mark,
+    # or with assorted glyphs when mark is None
+    def touchRect(self, x0, y0, x1, y1, mark):
+        if x0 >= x1 or y0 >= y1:
+            return
+        base = self.base
+        bys = range(y0 >> base, ((y1 - 1) >> base) + 1)
+        if mark is not None and mark != BLANK:
+            self._clock += 1
+        for bx in range((x0 >> base), ((x1 - 1) >> base) + 1):
+            for by in bys:
+                self._dirty.add((bx, by))
+                if mark is not None and mark != BLANK:
+                    self._last[base][bx][by] = mark
+                    self._stamp[base][bx][by] = self._clock
+
+    def _recomputeBase(self, bx, by):
+        size = 1 << self.base
+        x0, y0 = bx * size, by * size
+        counts = Counter()
+        for column in self.canvas._canvas[x0:x0 + size]:
+            counts.update(column[y0:y0 + size])
+        counts.pop(BLANK, None)
+        glyphs = self._glyphs[self.base]
+        glyphs[bx][by] = counts or None
+        last = self._last[self.base]
+        # The last glyph written may since have been drawn over
+        if last[bx][by] not in counts:
+            last[bx][by] = counts.most_common(1)[0][0] if counts else None
+
+    def _recomputeParent(self, k, bx, by):
+        counts = Counter()
+        last, stamp = None, 0
+        for cx in (2 * bx, 2 * bx + 1):
+            if cx >= len(self._glyphs[k - 1]):
+                continue
+            for cy in (2 * by, 2 * by + 1):
+                if cy >= len(self._glyphs[k - 1][cx]):
+                    continue
+                child = self._glyphs[k - 1][cx][cy]
+                if child:
+                    counts.update(child)
+                if self._last[k - 1][cx][cy] is not None and self._stamp[k - 1][cx][cy] >= stamp:
+                    last, stamp = self._last[k - 1][cx][cy], self._stamp[k - 1][cx][cy]
+        self._glyphs[k][bx][by] = counts or None
+        self._last[k][bx][by] = last
+        self._stamp[k][bx][by] = stamp
+
+    # Brings every level up to date with the canvas
+    def flush(self):
+        if not self._dirty:
+            return
+        dirty = self._dirty
+        self._dirty = set()
+        for bx, by in dirty:
+            self._recomputeBase(bx, by)
+        for k in range(self.base + 1, self.top + 1):
+            dirty = {(bx >> 1, by >> 1) for bx, by in dirty}
+            for bx, by in dirty:
+                self._recomputeParent(k, bx, by)
+
+    # The coarsest level detailed enough to show the canvas in at most
+    # width by height blocks, or the finest level if none is
+    def levelFor(self, width, height):
+        factor = max(self.canvas._x / max(width, 1), self.canvas._y / max(height, 1), 1)
+        return min(max(self.base, math.ceil(math.log2(factor))), self.top)
+
+    # Columns of one glyph per block at level k summarizing each block by
+    # its most common glyph, how full it is, or the glyph written last
+    def level(self, k, summary='majority'):
+        self.flush()
+        size = 1 << k
+        if summary == 'majority':
+            return [[counts.most_common(1)[0][0] if counts else BLANK for counts in column] for column in self._glyphs[k]]
+        if summary == 'last':
+            return [[glyph or BLANK for glyph in column] for column in self._last[k]]
+        if summary == 'density':
+            widths = [min(size, self.canvas._x - bx * size) for bx in range(len(self._glyphs[k]))]
+            heights = [min(size, self.canvas._y - by * size) for by in range(len(self._glyphs[k][0]))]
+            scale = len(SHADES) - 1
+            return [
+                [SHADES[-(-sum(counts.values()) * scale // (width * height))] if counts else BLANK for counts, height in zip(column, heights)]
+                for column, width in zip(self._glyphs[k], widths)
+            ]
+        raise InvalidParameter(f'Summary must be one of {", ".join(SUMMARIES)}')
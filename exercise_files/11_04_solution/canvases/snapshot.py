@@ -0,0 +1,42 @@
+from errors import InvalidParameter
+
+class Snapshot:
+    __slots__ = ('columns', 'width', 'height', 'tick', 'scribes')
+
+    # A frozen version of a canvas from Canvas.snapshot(): the cell columns
+    # (shared with the canvas and other snapshots, never written to), the
+    # next tick and every scribe's run state
+    def __init__(self, columns, width, height, tick, scribes):
+        self.columns = columns
+        self.width = width
+        self.height = height
+        self.tick = tick
+        self.scribes = scribes
+
+
+class History:
+    __slots__ = ('canvas', '_undo', '_redo')
+
+    # Undo and redo for a canvas. checkpoint() saves the current version;
+    # as snapshots share every column they have not changed, keeping many
+    # is cheap.
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self._undo = []
+        self._redo = []
+
+    def checkpoint(self):
+        self._undo.append(self.canvas.snapshot())
+        self._redo.clear()
+
+    def undo(self):
+        if not self._undo:
+            raise InvalidParameter('Nothing to undo')
+        self._redo.append(self.canvas.snapshot())
+        self.canvas.restore(self._undo.pop())
+
+    def redo(self):
+        if not self._redo:
+            raise InvalidParameter('Nothing to redo')
+        self._undo.append(self.canvas.snapshot())
+        self.canvas.restore(self._redo.pop())
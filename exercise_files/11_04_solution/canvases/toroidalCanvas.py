@@ -0,0 +1,34 @@
+from canvases.canvas import Canvas
+
+# A canvas without walls: scribes leaving one edge come back in on the
+# opposite edge instead of bouncing
+class ToroidalCanvas(Canvas):
+    __slots__ = ()
+
+    def __init__(self, width, height, **kwargs):
+        kwargs['boundary'] = 'wrap'
+        super().__init__(width, height, **kwargs)
+
+    def hitsWallCell(self, cx, cy):
+        return False
+
+    def hitsVerticalWall(self, point):
+        return False
+
+    def hitsHorizontalWall(self, point):
+        return False
+
+    def hitsWall(self, point):
+        return False
+
+    def foldPoint(self, x, y):
+        return x % self._x, y % self._y, False, False
+
+    # Moves have already drawn wrapped-around cells through setCell; bring
+    # the scribes' own positions back onto the canvas too
+    def settle(self):
+        for scribe in self.scribes:
+            cx, cy = scribe._cx, scribe._cy
+            if not (0 <= cx < self._x and 0 <= cy < self._y):
+                scribe.pos = (scribe._px + cx % self._x - cx, scribe._py + cy % self._y - cy)
+        super().settle()
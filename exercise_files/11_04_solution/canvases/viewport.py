@@ -0,0 +1,47 @@
+import os
+
+# Terminal size to assume when output is not a terminal
+DEFAULT_TERMINAL = (80, 24)
+
+# How many cells across and down fit in the terminal around the canvas's
+# MARGIN. Each cell prints as a glyph and a space, and the last line is
+# left for the cursor.
+def screenSize(canvas):
+    try:
+        columns, lines = os.get_terminal_size()
+    except OSError:
+        columns, lines = DEFAULT_TERMINAL
+    marginX, marginY = canvas.MARGIN
+    return max((columns + 1) // 2 - marginX, 1), max(lines - 1 - marginY, 1)
+
+class Viewport:
+    __slots__ = ('x', 'y', 'width', 'height', 'follow')
+
+    # The part of a canvas to render, with its top left cell at (x, y).
+    # width and height are in cells; left as None they fill the terminal,
+    # re-read every frame so resizing the terminal resizes the view. With a
+    # follow scribe the view moves to keep that scribe in the middle.
+    def __init__(self, x=0, y=0, width=None, height=None, follow=None):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.follow = follow
+
+    def size(self, canvas):
+        width, height = self.width, self.height
+        if width is None or height is None:
+            screenWidth, screenHeight = screenSize(canvas)
+            width = screenWidth if width is None else width
+            height = screenHeight if height is None else height
+        return min(width, canvas._x), min(height, canvas._y)
+
+    # (x0, y0, x1, y1) of the visible cells, x1 and y1 exclusive
+    def window(self, canvas):
+        width, height = self.size(canvas)
+        if self.follow is not None:
+            self.x = self.follow._cx - width // 2
+            self.y = self.follow._cy - height // 2
+        self.x = min(max(self.x, 0), canvas._x - width)
+        self.y = min(max(self.y, 0), canvas._y - height)
+        return self.x, self.y, self.x + width, self.y + height
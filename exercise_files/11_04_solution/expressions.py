@@ -0,0 +1,92 @@
+import ast
+import math
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from errors import InvalidParameter
+
+MATH_NAMES = {
+    'sin': math.sin, 'cos': math.cos, 'tan': math.tan,
+    'asin': math.asin, 'acos': math.acos, 'atan': math.atan,
+    'sinh': math.sinh, 'cosh': math.cosh, 'tanh': math.tanh,
+    'sqrt': math.sqrt, 'exp': math.exp, 'log': math.log,
+    'floor': math.floor, 'ceil': math.ceil, 'abs': abs,
+    'pi': math.pi, 'e': math.e,
+}
+
+NUMPY_NAMES = {
+    'sin': np.sin, 'cos': np.cos, 'tan': np.tan,
+    'asin': np.arcsin, 'acos': np.arccos, 'atan': np.arctan,
+    'sinh': np.sinh, 'cosh': np.cosh, 'tanh': np.tanh,
+    'sqrt': np.sqrt, 'exp': np.exp, 'log': np.log,
+    'floor': np.floor, 'ceil': np.ceil, 'abs': np.abs,
+    'pi': np.pi, 'e': np.e,
+} if np is not None else None
+
+ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Load, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.USub, ast.UAdd,
+)
+
+
+class Expression:
+    __slots__ = ('text', 'variables', '_code')
+
+    def __init__(self, text, variables=('x',)):
+        self.text = text
+        self.variables = variables
+        try:
+            tree = ast.parse(text, mode='eval')
+        except SyntaxError:
+            raise InvalidParameter(f'Expression "{text}" is not valid')
+        for node in ast.walk(tree):
+            self._check(node)
+            # Float constants keep x**99**99 from turning into a huge integer
+            if isinstance(node, ast.Constant):
+                node.value = float(node.value)
+        self._code = compile(tree, '<expression>', 'eval')
+
+    # Only arithmetic on numbers, the given variables and the MATH_NAMES
+    # functions and constants is allowed
+    def _check(self, node):
+        if not isinstance(node, ALLOWED_NODES):
+            raise InvalidParameter(f'Expression "{self.text}" may not contain {type(node).__name__}')
+        if isinstance(node, ast.Constant) and (isinstance(node.value, bool) or not isinstance(node.value, (int, float))):
+            raise InvalidParameter(f'Expression "{self.text}" may only contain numeric constants')
+        if isinstance(node, ast.Name) and node.id not in self.variables and node.id not in MATH_NAMES:
+            raise InvalidParameter(f'Unknown name "{node.id}" in expression "{self.text}"')
+        if isinstance(node, ast.Call) and (node.keywords or not isinstance(node.func, ast.Name) or not callable(MATH_NAMES.get(node.func.id))):
+            raise InvalidParameter(f'Expression "{self.text}" may only call {", ".join(n for n, f in MATH_NAMES.items() if callable(f))}')
+
+    def __eq__(self, other):
+        return isinstance(other, Expression) and (self.text, self.variables) == (other.text, other.variables)
+
+    def __hash__(self):
+        return hash((self.text, self.variables))
+
+    def __repr__(self):
+        return f'Expression({self.text!r})'
+
+    # Evaluates element-wise when any argument is a NumPy array, otherwise
+    # with the math module. Undefined points are None (scalars) or NaN or
+    # infinity (arrays)
+    def __call__(self, *values):
+        if np is not None and any(isinstance(value, np.ndarray) for value in values):
+            namespace = dict(NUMPY_NAMES, **dict(zip(self.variables, values)))
+            with np.errstate(all='ignore'):
+                return eval(self._code, {'__builtins__': {}}, namespace)
+        namespace = dict(MATH_NAMES, **dict(zip(self.variables, values)))
+        try:
+            return eval(self._code, {'__builtins__': {}}, namespace)
+        except (ValueError, ZeroDivisionError, OverflowError):
+            return None
+
+
+# Parsing and compiling happens once per distinct expression text
+@lru_cache(maxsize=256)
+def compileExpression(text, variables=('x',)):
+    return Expression(text, variables)
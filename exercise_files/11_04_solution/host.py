@@ -0,0 +1,224 @@
+import argparse
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Import these so that we can pass them to "fromFile" as globals
+from canvases.canvas import Canvas
+from canvases.canvasAxis import CanvasAxis
+from canvases.toroidalCanvas import ToroidalCanvas
+from scribes.plotScribe import PlotScribe
+from scribes.implicitPlotScribe import ImplicitPlotScribe
+from scribes.randomScribe import RandomWalkScribe
+from scribes.robotScribe import RobotScribe
+from scribes.terminalScribe import TerminalScribe
+from renderers.fileRenderer import COLOR_CODES
+from renderers.nullRenderer import NullRenderer
+
+
+# One scribe file running headless inside a SimulationHost. budget is the
+# most ticks it may run, or None to run all of them. state is 'running',
+# 'done', 'budget' (stopped at its budget) or 'error'.
+class Scene:
+    __slots__ = ('id', 'name', 'canvas', 'tick', 'ticks', 'budget', 'state', 'error', 'seconds')
+
+    def __init__(self, id, name, budget=None):
+        self.id = id
+        self.name = name
+        self.canvas = Canvas.fromFile(name, globals())
+        self.canvas.renderer = NullRenderer()
+        self.tick = 0
+        self.ticks = self.canvas.ticks()
+        self.budget = budget
+        self.state = 'running'
+        self.error = None
+        self.seconds = 0.0
+        self._finish()
+
+    # Runs up to count more ticks
+    def run(self, count):
+        start = time.perf_counter()
+        end = min(self.tick + count, self.ticks)
+        if self.budget is not None:
+            end = min(end, self.budget)
+        try:
+            for i in range(self.tick, end):
+                self.canvas.tick(i)
+                self.tick = i + 1
+        except Exception as e:
+            self.state = 'error'
+            self.error = COLOR_CODES.sub('', str(e)) or type(e).__name__
+        self.seconds += time.perf_counter() - start
+        self._finish()
+
+    def _finish(self):
+        if self.state != 'running':
+            return
+        if self.tick >= self.ticks:
+            self.state = 'done'
+        elif self.budget is not None and self.tick >= self.budget:
+            self.state = 'budget'
+
+    def toDict(self):
+        return {
+            'id': self.id,
+            'file': self.name,
+            'state': self.state,
+            'tick': self.tick,
+            'ticks': self.ticks,
+            'budget': self.budget,
+            'seconds': self.seconds,
+            'error': self.error,
+        }
+
+
+# Runs many scenes in one process. A single scheduler thread steps the
+# running scenes round robin, sliceTicks ticks at a time, so that no scene
+# can hold up the others, and the HTTP API reads and changes scenes
+# between slices under the same lock.
+class SimulationHost:
+    def __init__(self, sliceTicks=10, budget=None):
+        self.sliceTicks = sliceTicks
+        self.budget = budget
+        self.scenes = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def add(self, name, budget=None):
+        scene = Scene(next(self._ids), name, self.budget if budget is None else budget)
+        with self._lock:
+            self.scenes[scene.id] = scene
+        return scene
+
+    def remove(self, id):
+        with self._lock:
+            return self.scenes.pop(id, None)
+
+    # One slice of every running scene. Returns whether any scene ran.
+    def step(self):
+        ran = False
+        for scene in list(self.scenes.values()):
+            with self._lock:
+                if scene.state == 'running' and scene.id in self.scenes:
+                    scene.run(self.sliceTicks)
+                    ran = True
+        return ran
+
+    def run(self, idle=.05):
+        while not self._stopping.is_set():
+            if not self.step():
+                self._stopping.wait(idle)
+
+    def stop(self):
+        self._stopping.set()
+
+    # Calls func(scene) under the lock, so the scene is not mid-slice
+    def inspect(self, id, func):
+        with self._lock:
+            scene = self.scenes.get(id)
+            return None if scene is None else func(scene)
+
+    def summary(self):
+        with self._lock:
+            return [scene.toDict() for scene in self.scenes.values()]
+
+
+# The local API:
+#   GET    /scenes              every scene's state
+#   POST   /scenes              {"file": NAME, "budget": TICKS} loads NAME.json
+#   GET    /scenes/ID           one scene's state
+#   GET    /scenes/ID/frame     the scene's current frame as plain text
+#   GET    /scenes/ID/canvas    the scene's canvas as a Scribe file
+#   DELETE /scenes/ID           stops and removes the scene
+def serve(host, port, address='127.0.0.1'):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, body, contentType='application/json'):
+            if contentType == 'application/json':
+                body = json.dumps(body)
+            body = body.encode()
+            self.send_response(status)
+            self.send_header('Content-Type', contentType + '; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        # (scene id, what) from the path, or None when it does not match
+        def _route(self):
+            parts = self.path.strip('/').split('/')
+            if parts[0] != 'scenes' or len(parts) > 3:
+                return None
+            if len(parts) == 1:
+                return None, None
+            if not parts[1].isdigit():
+                return None
+            return int(parts[1]), parts[2] if len(parts) == 3 else None
+
+        def do_GET(self):
+            route = self._route()
+            if route is None:
+                return self._send(404, {'error': 'Not found'})
+            id, what = route
+            if id is None:
+                return self._send(200, host.summary())
+            if what is None:
+                body = host.inspect(id, Scene.toDict)
+            elif what == 'frame':
+                body = host.inspect(id, lambda scene: COLOR_CODES.sub('', scene.canvas.render()))
+            elif what == 'canvas':
+                body = host.inspect(id, lambda scene: scene.canvas.toDict())
+            else:
+                return self._send(404, {'error': 'Not found'})
+            if body is None:
+                return self._send(404, {'error': f'No scene {id}'})
+            self._send(200, body, 'text/plain' if what == 'frame' else 'application/json')
+
+        def do_POST(self):
+            if self._route() != (None, None):
+                return self._send(404, {'error': 'Not found'})
+            try:
+                request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                scene = host.add(request['file'], request.get('budget'))
+            except (ValueError, KeyError, TypeError):
+                return self._send(400, {'error': 'Expected {"file": NAME, "budget": TICKS}'})
+            except Exception as e:
+                return self._send(400, {'error': COLOR_CODES.sub('', str(e))})
+            self._send(201, host.inspect(scene.id, Scene.toDict))
+
+        def do_DELETE(self):
+            route = self._route()
+            if route is None or route[0] is None or route[1] is not None:
+                return self._send(404, {'error': 'Not found'})
+            if host.remove(route[0]) is None:
+                return self._send(404, {'error': f'No scene {route[0]}'})
+            self._send(200, {'removed': route[0]})
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((address, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-i', '--input', action='append', default=[], help='Scribe file to start with (repeatable)')
+    parser.add_argument('-p', '--port', type=int, default=8800, help='Port of the local API (default: 8800)')
+    parser.add_argument('--address', default='127.0.0.1', help='Address of the local API (default: 127.0.0.1)')
+    parser.add_argument('--budget', type=int, help='Default most ticks a scene may run')
+    parser.add_argument('--slice', type=int, default=10, help='Ticks a scene runs before the next gets a turn (default: 10)')
+    args = parser.parse_args()
+
+    host = SimulationHost(args.slice, args.budget)
+    for name in args.input:
+        host.add(name)
+    server = serve(host, args.port, args.address)
+    print(f'Serving http://{args.address}:{server.server_address[1]}/scenes')
+    try:
+        host.run()
+    except KeyboardInterrupt:
+        server.shutdown()
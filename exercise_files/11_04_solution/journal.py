@@ -0,0 +1,131 @@
+import json
+import os
+import time
+
+# A journal is name.journal: a header line {"generation": G}, then one JSON
+# line per save holding the canvas's next tick, the current glyphs of the
+# cells written since the previous save, the current visit counts of the
+# cells visited since then when the heatmap is on, and every scribe's run
+# state.
+# Canvas.fromFile applies it on top of the snapshot name.json, but only if
+# the snapshot has the same generation: compaction writes a new snapshot
+# and then a new journal, so a journal left over from before a compaction
+# is never applied twice.
+
+
+def writeAtomic(path, text):
+    with open(path+'.tmp', 'w') as f:
+        f.write(text)
+    os.replace(path+'.tmp', path)
+
+
+# Brings canvas, loaded from the snapshot of the given generation, up to
+# date with name.journal. A last line cut off mid-write is ignored.
+def replayJournal(canvas, name, generation):
+    if generation is None:
+        return
+    try:
+        f = open(name+'.journal')
+    except FileNotFoundError:
+        return
+    with f:
+        header = f.readline()
+        if not header or json.loads(header).get('generation') != generation:
+            return
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+            for x0, y0, columns in entry['rects']:
+                for x, column in enumerate(columns, x0):
+                    canvas._canvas[x][y0:y0 + len(column)] = column
+            for x, y, glyph in entry['cells']:
+                canvas._canvas[x][y] = glyph
+            if canvas._visits is not None:
+                for x, y, count in entry.get('visits', ()):
+                    if canvas._visits[x][y] == 0:
+                        canvas.visitedCells += 1
+                    canvas.topVisits = max(canvas.topVisits, count)
+                    canvas._visits[x][y] = count
+            canvas.nextTick = entry['tick']
+            for scribe, state in zip(canvas.scribes, entry['scribes']):
+                scribe.setRunState(state)
+
+
+# Saves a running canvas incrementally. It watches the canvas's writes, so
+# a save only costs the cells changed since the last one plus a few
+# numbers per scribe. Every compactEvery saves, and when it starts, it
+# writes a full snapshot with toDict instead.
+#
+# As a frame listener it saves whenever interval seconds have passed.
+class Journal:
+    def __init__(self, canvas, name, interval=5, compactEvery=100):
+        self.canvas = canvas
+        self.name = name
+        self.interval = interval
+        self.compactEvery = compactEvery
+        self.saves = 0
+        self._cells = set()
+        self._rects = []
+        self._file = None
+        self._lastSave = time.perf_counter()
+        canvas.watchers.append(self)
+        if canvas._visits is not None:
+            canvas.changedVisits = set()
+        self.compact()
+
+    def touch(self, cx, cy, mark):
+        self._cells.add((cx, cy))
+
+    def touchRect(self, x0, y0, x1, y1, mark):
+        self._rects.append((x0, y0, x1, y1))
+
+    def __call__(self, frame):
+        if time.perf_counter() - self._lastSave >= self.interval:
+            self.save()
+
+    def save(self):
+        canvas = self.canvas
+        cells = canvas._canvas
+        entry = {
+            'tick': canvas.nextTick,
+            'rects': [[x0, y0, [column[y0:y1] for column in cells[x0:x1]]] for x0, y0, x1, y1 in self._rects],
+            'cells': [[x, y, cells[x][y]] for x, y in self._cells],
+            'scribes': [scribe.runState() for scribe in canvas.scribes],
+        }
+        if canvas.changedVisits is not None:
+            entry['visits'] = [[x, y, canvas._visits[x][y]] for x, y in canvas.changedVisits]
+            canvas.changedVisits.clear()
+        self._file.write(json.dumps(entry) + '\n')
+        self._file.flush()
+        self._cells = set()
+        self._rects = []
+        self.saves += 1
+        self._lastSave = time.perf_counter()
+        if self.saves >= self.compactEvery:
+            self.compact()
+
+    # Folds everything into a new snapshot and starts an empty journal
+    def compact(self):
+        generation = time.time_ns()
+        data = self.canvas.toDict()
+        data['generation'] = generation
+        writeAtomic(self.name+'.json', json.dumps(data))
+        if self._file is not None:
+            self._file.close()
+        writeAtomic(self.name+'.journal', json.dumps({'generation': generation}) + '\n')
+        self._file = open(self.name+'.journal', 'a')
+        self._cells = set()
+        self._rects = []
+        if self.canvas.changedVisits is not None:
+            self.canvas.changedVisits.clear()
+        self.saves = 0
+        self._lastSave = time.perf_counter()
+
+    # Saves anything still unsaved and stops watching the canvas
+    def close(self):
+        self.save()
+        self._file.close()
+        self.canvas.watchers.remove(self)
+        self.canvas.changedVisits = None
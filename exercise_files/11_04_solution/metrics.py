@@ -0,0 +1,124 @@
+import bisect
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Upper bounds, in seconds, of the render latency histogram buckets
+RENDER_BUCKETS = (.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1.0)
+
+
+# Resident set size of this process in bytes: current from /proc where
+# there is one, otherwise the peak from getrusage, otherwise 0
+def rss():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return peak if sys.platform == 'darwin' else peak * 1024
+    return 0
+
+
+# Counters that Canvas.go updates while it is set as canvas.metrics. The
+# loop only does a few additions per tick; everything else is worked out
+# when the metrics are scraped.
+class Metrics:
+    def __init__(self):
+        self.ticks = 0
+        self.tick = -1
+        self.droppedFrames = 0
+        self.bytesWritten = 0
+        # Per-bucket (not cumulative) counts, the last one is +Inf
+        self.renderCounts = [0] * (len(RENDER_BUCKETS) + 1)
+        self.renderSeconds = 0.0
+        self.ticksPerSecond = 0.0
+        self._windowStart = time.perf_counter()
+        self._windowTicks = 0
+
+    def recordRender(self, seconds, size):
+        self.renderCounts[bisect.bisect_left(RENDER_BUCKETS, seconds)] += 1
+        self.renderSeconds += seconds
+        self.bytesWritten += size
+
+    # A frame is dropped when the tick's work alone took longer than the
+    # framerate allows for the whole tick. ticksPerSecond is the rate over
+    # the last full second.
+    def recordTick(self, i, seconds, framerate, now):
+        self.tick = i
+        self.ticks += 1
+        if framerate and seconds > framerate:
+            self.droppedFrames += 1
+        if now - self._windowStart >= 1:
+            self.ticksPerSecond = (self.ticks - self._windowTicks) / (now - self._windowStart)
+            self._windowStart = now
+            self._windowTicks = self.ticks
+
+    # Prometheus text exposition format
+    def exposition(self, canvas):
+        live = sum(1 for scribe in canvas.scribes if len(scribe.moves) > self.tick + 1)
+        lines = [
+            '# HELP scribe_ticks_total Ticks run by Canvas.go.',
+            '# TYPE scribe_ticks_total counter',
+            f'scribe_ticks_total {self.ticks}',
+            '# HELP scribe_ticks_per_second Ticks run during the last full second.',
+            '# TYPE scribe_ticks_per_second gauge',
+            f'scribe_ticks_per_second {self.ticksPerSecond}',
+            '# HELP scribe_render_seconds Time to render a frame.',
+            '# TYPE scribe_render_seconds histogram',
+        ]
+        total = 0
+        for bound, count in zip(RENDER_BUCKETS + ('+Inf',), self.renderCounts):
+            total += count
+            lines.append(f'scribe_render_seconds_bucket{{le="{bound}"}} {total}')
+        lines += [
+            f'scribe_render_seconds_sum {self.renderSeconds}',
+            f'scribe_render_seconds_count {total}',
+            '# HELP scribe_dropped_frames_total Ticks that overran the framerate.',
+            '# TYPE scribe_dropped_frames_total counter',
+            f'scribe_dropped_frames_total {self.droppedFrames}',
+            '# HELP scribe_written_bytes_total Bytes of frames written to the terminal.',
+            '# TYPE scribe_written_bytes_total counter',
+            f'scribe_written_bytes_total {self.bytesWritten}',
+            '# HELP scribe_live_scribes Scribes with moves still to run.',
+            '# TYPE scribe_live_scribes gauge',
+            f'scribe_live_scribes {live}',
+            '# HELP process_resident_memory_bytes Resident memory size in bytes.',
+            '# TYPE process_resident_memory_bytes gauge',
+            f'process_resident_memory_bytes {rss()}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+
+# Serves canvas.metrics at http://host:port/metrics from a daemon thread.
+# Returns the server; call shutdown() on it to stop.
+def serve(canvas, port, host='127.0.0.1'):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != '/metrics':
+                self.send_error(404)
+                return
+            body = canvas.metrics.exposition(canvas).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        # Keep scrapes from printing over the canvas
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
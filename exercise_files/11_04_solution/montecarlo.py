@@ -0,0 +1,85 @@
+import argparse
+import json
+from multiprocessing import Pool
+
+import numpy as np
+
+# Import these so that we can pass them to "fromFile" as globals
+from canvases.canvas import Canvas
+from canvases.canvasAxis import CanvasAxis
+from canvases.toroidalCanvas import ToroidalCanvas
+from scribes.plotScribe import PlotScribe
+from scribes.implicitPlotScribe import ImplicitPlotScribe
+from scribes.randomScribe import RandomWalkScribe
+from scribes.robotScribe import RobotScribe
+from scribes.terminalScribe import TerminalScribe
+
+
+# Runs one headless replica of a scribe file. Every RandomWalkScribe gets
+# its own random stream spawned from the replica's seed sequence. Returns
+# the per-cell visit counts and the fraction of cells visited after each
+# tick, rather than the canvas itself.
+def runReplica(task):
+    name, seedSequence = task
+    canvas = Canvas.fromFile(name, globals())
+    canvas.resetVisits()
+    walkers = [scribe for scribe in canvas.scribes if isinstance(scribe, RandomWalkScribe)]
+    for scribe, seed in zip(walkers, seedSequence.spawn(len(walkers))):
+        scribe.reseed(seed)
+
+    coverage = np.zeros(canvas.ticks())
+    for i in range(len(coverage)):
+        canvas.tick(i)
+        coverage[i] = canvas.visitedCells
+    return canvas.visitCounts(), coverage / (canvas._x * canvas._y)
+
+
+# Runs replicas copies of the scribe file across a process pool and
+# aggregates them as they finish: total visits per cell, and the mean and
+# standard deviation of the coverage curve
+def runBatch(name, replicas, seed=None, processes=None):
+    tasks = [(name, child) for child in np.random.SeedSequence(seed).spawn(replicas)]
+    visits = None
+    coverageSum = coverageSquares = None
+    with Pool(processes) as pool:
+        for replicaVisits, coverage in pool.imap_unordered(runReplica, tasks):
+            if visits is None:
+                visits = np.zeros_like(replicaVisits)
+                coverageSum = np.zeros_like(coverage)
+                coverageSquares = np.zeros_like(coverage)
+            visits += replicaVisits
+            coverageSum += coverage
+            coverageSquares += coverage ** 2
+    mean = coverageSum / replicas
+    return {
+        'replicas': replicas,
+        'seed': seed,
+        'visits': visits,
+        'coverageMean': mean,
+        'coverageStd': np.sqrt(np.maximum(coverageSquares / replicas - mean ** 2, 0)),
+    }
+
+
+def toFile(results, name):
+    with open(name+'.json', 'w') as f:
+        f.write(json.dumps({key: val.tolist() if isinstance(val, np.ndarray) else val for key, val in results.items()}))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-i', '--input', required=True, help='The input Scribe file to run')
+    parser.add_argument('-n', '--replicas', type=int, default=100, help='Number of independent runs')
+    parser.add_argument('-s', '--seed', type=int, help='Root seed the replica seeds are spawned from')
+    parser.add_argument('-p', '--processes', type=int, help='Worker processes (default: one per CPU)')
+    parser.add_argument('-o', '--output', help='Write the aggregated results to this file (.json is added)')
+
+    args = parser.parse_args()
+
+    results = runBatch(args.input, args.replicas, args.seed, args.processes)
+    coverage = results['coverageMean']
+    print(f'{args.replicas} replicas, {len(coverage)} ticks')
+    print(f'Final coverage {coverage[-1]:.3f} (std {results["coverageStd"][-1]:.3f})')
+    cell = np.unravel_index(results['visits'].argmax(), results['visits'].shape)
+    print(f'Most visited cell ({cell[0]}, {cell[1]})')
+    if args.output:
+        toFile(results, args.output)
@@ -0,0 +1,81 @@
+import cProfile
+import json
+import time
+
+# Phases of a Canvas.go tick, in the order they run
+PHASES = ('moves', 'settle', 'clear', 'render', 'write', 'sleep')
+
+
+# Collects timings from Canvas.go while it is set as canvas.profiler.
+# Nothing is measured (and nothing is slowed down) without one.
+class Profiler:
+    def __init__(self, cprofile=False):
+        self.ticks = 0
+        self.phases = {phase: 0.0 for phase in PHASES}
+        # scribe label -> number of moves run
+        self.moveCounts = {}
+        # move name -> [number of calls, total seconds]
+        self.moveTimes = {}
+        self.cprofile = cProfile.Profile() if cprofile else None
+        # Seconds spent in moves during the current tick
+        self._tickMoves = 0.0
+
+    def scribeLabel(self, index, scribe):
+        return f'{index}:{type(scribe).__name__}'
+
+    def recordMove(self, label, name, seconds):
+        self.moveCounts[label] = self.moveCounts.get(label, 0) + 1
+        timing = self.moveTimes.setdefault(name, [0, 0.0])
+        timing[0] += 1
+        timing[1] += seconds
+
+    # Canvas.tick runs each move through here while profiling
+    def runMove(self, index, scribe, move, canvas):
+        start = time.perf_counter()
+        move[0](*move[1], canvas)
+        seconds = time.perf_counter() - start
+        self.recordMove(self.scribeLabel(index, scribe), move[0].__name__, seconds)
+        self._tickMoves += seconds
+
+    # Called by Canvas.go after each tick. The time tick() took that was not
+    # spent in moves went to settling.
+    def recordTick(self, tick, clear, render, write, sleep):
+        self.phases['moves'] += self._tickMoves
+        self.phases['settle'] += tick - self._tickMoves
+        self.phases['clear'] += clear
+        self.phases['render'] += render
+        self.phases['write'] += write
+        self.phases['sleep'] += sleep
+        self._tickMoves = 0.0
+        self.ticks += 1
+
+    def total(self):
+        return sum(self.phases.values())
+
+    def toDict(self):
+        return {
+            'ticks': self.ticks,
+            'total': self.total(),
+            'phases': self.phases,
+            'moveCounts': self.moveCounts,
+            'moveTimes': {name: {'calls': calls, 'seconds': seconds} for name, (calls, seconds) in self.moveTimes.items()},
+        }
+
+    def toFile(self, name):
+        with open(name+'.json', 'w') as f:
+            f.write(json.dumps(self.toDict(), indent=2))
+        if self.cprofile is not None:
+            self.cprofile.dump_stats(name+'.prof')
+
+    def summary(self):
+        total = self.total() or 1
+        lines = [f'{self.ticks} ticks in {self.total():.3f}s', '', f'{"phase":<12}{"seconds":>10}{"share":>8}']
+        for phase, seconds in self.phases.items():
+            lines.append(f'{phase:<12}{seconds:>10.4f}{seconds / total:>8.1%}')
+        lines += ['', f'{"move":<20}{"calls":>8}{"seconds":>10}{"us/call":>10}']
+        for name, (calls, seconds) in sorted(self.moveTimes.items(), key=lambda item: -item[1][1]):
+            lines.append(f'{name:<20}{calls:>8}{seconds:>10.4f}{seconds / calls * 1e6:>10.1f}')
+        lines += ['', f'{"scribe":<20}{"moves":>8}']
+        for label, count in self.moveCounts.items():
+            lines.append(f'{label:<20}{count:>8}')
+        return '\n'.join(lines)
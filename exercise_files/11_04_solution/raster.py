@@ -0,0 +1,118 @@
+import math
+
+from utils import cell_index
+
+# Integer rasterization helpers shared by the scribe drawing moves
+
+
+# All cells on the line from (x0, y0) to (x1, y1), both ends included
+def bresenham(x0, y0, x1, y1):
+    dx = abs(x1 - x0)
+    dy = -abs(y1 - y0)
+    sx = 1 if x0 < x1 else -1
+    sy = 1 if y0 < y1 else -1
+    error = dx + dy
+    while True:
+        yield x0, y0
+        if x0 == x1 and y0 == y1:
+            return
+        e2 = 2 * error
+        if e2 >= dy:
+            error += dy
+            x0 += sx
+        if e2 <= dx:
+            error += dx
+            y0 += sy
+
+
+# Folds a coordinate back onto the canvas the way a scribe bouncing off
+# the walls would travel. Anything that still rounds onto the canvas is
+# left alone; the rest turns around at the edge cells, like step-by-step
+# moves do. Also returns whether the direction ends up reversed (an odd
+# number of bounces).
+def fold(value, size):
+    if size <= 1:
+        return 0, False
+    if 0 <= cell_index(value) < size:
+        return value, False
+    period = 2 * (size - 1)
+    value = value % period
+    if value > size - 1:
+        return period - value, True
+    return value, False
+
+
+# Midpoint circle: the cells of a circle of integer radius around (0, 0),
+# built from one octant and its seven mirror images
+def circleCells(radius):
+    cells = set()
+    x, y = radius, 0
+    error = 1 - radius
+    while x >= y:
+        for cx, cy in ((x, y), (y, x)):
+            cells.update(((cx, cy), (-cx, cy), (cx, -cy), (-cx, -cy)))
+        y += 1
+        if error < 0:
+            error += 2 * y + 1
+        else:
+            x -= 1
+            error += 2 * (y - x) + 1
+    return cells
+
+
+# Heading of (dx, dy) in scribe degrees: 0 is up, 90 is right
+def heading(dx, dy):
+    return math.degrees(math.atan2(dx, -dy))
+
+
+# Cells of the arc around (cx, cy) starting at heading start and sweeping
+# clockwise for positive sweep, counterclockwise for negative, ordered
+# along the sweep
+def arcCells(cx, cy, radius, start, sweep):
+    direction = 1 if sweep >= 0 else -1
+    progress = []
+    for x, y in circleCells(radius):
+        travelled = (direction * (heading(x, y) - start)) % 360
+        if abs(sweep) >= 360 or travelled <= abs(sweep) + 0.5:
+            progress.append((travelled, cx + x, cy + y))
+    progress.sort()
+    return [(x, y) for _, x, y in progress]
+
+
+def _split(points):
+    left, right = [points[0]], [points[-1]]
+    while len(points) > 1:
+        points = [((a[0] + b[0]) / 2, (a[1] + b[1]) / 2) for a, b in zip(points, points[1:])]
+        left.append(points[0])
+        right.append(points[-1])
+    return left, right[::-1]
+
+
+def _isFlat(points, tolerance):
+    (x0, y0), (x1, y1) = points[0], points[-1]
+    length = math.hypot(x1 - x0, y1 - y0)
+    for x, y in points[1:-1]:
+        if length:
+            distance = abs((x1 - x0) * (y0 - y) - (x0 - x) * (y1 - y0)) / length
+        else:
+            distance = math.hypot(x - x0, y - y0)
+        if distance > tolerance:
+            return False
+    return True
+
+
+# Adaptive subdivision of the Bezier curve with the given control points
+# (any degree): halves the curve until every piece is within tolerance of
+# a straight line, and returns the polyline through the pieces' end points
+def bezierPolyline(points, tolerance=0.5, maxDepth=16):
+    polyline = [points[0]]
+    stack = [(points, 0)]
+    while stack:
+        curve, depth = stack.pop()
+        if depth >= maxDepth or _isFlat(curve, tolerance):
+            polyline.append(curve[-1])
+            continue
+        left, right = _split(curve)
+        stack.append((right, depth + 1))
+        stack.append((left, depth + 1))
+    return polyline
@@ -0,0 +1,109 @@
+import json
+import time
+
+# Recordings are asciicast-style: a JSON header line, then one JSON line
+# per frame, [seconds since the first frame, kind, data]. Kind 'k' is a
+# keyframe whose data is every row of the frame; kind 'd' is a delta whose
+# data is [row, text] for the rows that changed since the previous frame.
+# name.index.json lists the keyframes as [frame, seconds, byte offset] so
+# that replay can seek without reading the whole recording.
+
+
+# Rows of current that differ from previous, as [row, text] pairs
+def frameDelta(previous, current):
+    return [[row, text] for row, (old, text) in enumerate(zip(previous, current)) if old != text]
+
+
+# One line of a recording (or of a broadcast.Broadcaster stream)
+def frameLine(seconds, kind, data):
+    return json.dumps([seconds, kind, data]).encode() + b'\n'
+
+
+# The rows of the frame after applying a [seconds, kind, data] line to
+# rows, the rows of the frame before it. rows may be changed in place.
+def applyFrame(rows, kind, data):
+    if kind == 'k':
+        return data
+    for row, text in data:
+        rows[row] = text
+    return rows
+
+
+# A Canvas frame listener that streams every frame it is given to
+# name.cast. Deltas are cheap to work out and the file is flushed at each
+# keyframe, so recording costs the live run little.
+class Recorder:
+    def __init__(self, name, canvas, keyframeInterval=100):
+        self.name = name
+        self.keyframeInterval = keyframeInterval
+        self.frames = 0
+        self.keyframes = []
+        self._previous = None
+        self._start = None
+        self._seconds = 0
+        self._file = open(name+'.cast', 'wb')
+        self._file.write(json.dumps({'version': 1, 'width': canvas._x, 'height': canvas._y, 'keyframeInterval': keyframeInterval}).encode() + b'\n')
+
+    def __call__(self, frame):
+        now = time.perf_counter()
+        if self._start is None:
+            self._start = now
+        self._seconds = round(now - self._start, 6)
+        rows = frame.split('\n')
+        if self._previous is None or len(rows) != len(self._previous) or self.frames % self.keyframeInterval == 0:
+            self.keyframes.append([self.frames, self._seconds, self._file.tell()])
+            self._file.write(frameLine(self._seconds, 'k', rows))
+            self._file.flush()
+        else:
+            self._file.write(frameLine(self._seconds, 'd', frameDelta(self._previous, rows)))
+        self._previous = rows
+        self.frames += 1
+
+    def close(self):
+        self._file.close()
+        with open(self.name+'.index.json', 'w') as f:
+            f.write(json.dumps({'frames': self.frames, 'duration': self._seconds, 'keyframes': self.keyframes}))
+
+
+# The keyframe index of a recording, rebuilt from the recording itself
+# when the index file is missing (for example after an interrupted run)
+def readIndex(name):
+    try:
+        with open(name+'.index.json') as f:
+            return json.loads(f.read())
+    except FileNotFoundError:
+        pass
+    keyframes = []
+    frames = 0
+    seconds = 0
+    with open(name+'.cast', 'rb') as f:
+        f.readline()
+        offset = f.tell()
+        for line in iter(f.readline, b''):
+            seconds, kind, _ = json.loads(line)
+            if kind == 'k':
+                keyframes.append([frames, seconds, offset])
+            frames += 1
+            offset = f.tell()
+    return {'frames': frames, 'duration': seconds, 'keyframes': keyframes}
+
+
+# Yields (seconds, frame text) for every frame from start seconds on,
+# starting from the last keyframe at or before start
+def readFrames(name, start=0):
+    keyframes = readIndex(name)['keyframes']
+    if not keyframes:
+        return
+    offset = keyframes[0][2]
+    for frame, seconds, keyOffset in keyframes:
+        if seconds > start:
+            break
+        offset = keyOffset
+    rows = None
+    with open(name+'.cast', 'rb') as f:
+        f.seek(offset)
+        for line in f:
+            seconds, kind, data = json.loads(line)
+            rows = applyFrame(rows, kind, data)
+            if seconds >= start:
+                yield seconds, '\n'.join(rows)
@@ -0,0 +1,24 @@
+import re
+
+from renderers.renderer import Renderer
+
+# termcolor's color codes
+COLOR_CODES = re.compile('\x1b\\[[0-9;]*m')
+
+class FileRenderer(Renderer):
+    __slots__ = ('_file',)
+
+    # Writes frames to name.txt as plain text, without colors, with a form
+    # feed line between frames
+    def __init__(self, name):
+        self._file = open(name+'.txt', 'w')
+
+    def clear(self):
+        if self._file.tell():
+            self._file.write('\f\n')
+
+    def write(self, frame):
+        self._file.write(COLOR_CODES.sub('', frame) + '\n')
+
+    def close(self):
+        self._file.close()
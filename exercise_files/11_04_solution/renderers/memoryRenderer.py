@@ -0,0 +1,13 @@
+from collections import deque
+
+from renderers.renderer import Renderer
+
+class MemoryRenderer(Renderer):
+    __slots__ = ('frames',)
+
+    # Keeps the frames in memory, only the last maxFrames when that is set
+    def __init__(self, maxFrames=None):
+        self.frames = deque(maxlen=maxFrames)
+
+    def write(self, frame):
+        self.frames.append(frame)
@@ -0,0 +1,8 @@
+from renderers.renderer import Renderer
+
+# Drops every frame, for benchmarks and headless runs
+class NullRenderer(Renderer):
+    __slots__ = ()
+
+    def write(self, frame):
+        pass
@@ -0,0 +1,13 @@
+# Where a Canvas sends its frames. clear() comes before each frame is
+# written; close() is for backends holding a file or connection.
+class Renderer:
+    __slots__ = ()
+
+    def clear(self):
+        pass
+
+    def write(self, frame):
+        raise NotImplementedError
+
+    def close(self):
+        pass
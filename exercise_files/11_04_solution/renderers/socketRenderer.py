@@ -0,0 +1,21 @@
+import socket
+
+from renderers.renderer import Renderer
+from renderers.terminalRenderer import CLEAR
+
+class SocketRenderer(Renderer):
+    __slots__ = ('_socket',)
+
+    # Sends frames, ANSI clears included, to a TCP listener such as
+    # "nc -l PORT" running in another terminal
+    def __init__(self, host, port):
+        self._socket = socket.create_connection((host, port))
+
+    def clear(self):
+        self._socket.sendall(CLEAR.encode())
+
+    def write(self, frame):
+        self._socket.sendall(frame.encode() + b'\n')
+
+    def close(self):
+        self._socket.close()
@@ -0,0 +1,20 @@
+import sys
+
+from renderers.renderer import Renderer
+
+# Cursor to the top left, then erase the screen
+CLEAR = '\x1b[H\x1b[2J'
+
+class TerminalRenderer(Renderer):
+    __slots__ = ('stream',)
+
+    # Clears with ANSI escape codes rather than running the clear command.
+    # Without a stream, whatever sys.stdout is at the time is used.
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def clear(self):
+        (self.stream or sys.stdout).write(CLEAR)
+
+    def write(self, frame):
+        (self.stream or sys.stdout).write(frame + '\n')
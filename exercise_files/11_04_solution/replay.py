@@ -0,0 +1,26 @@
+import argparse
+import time
+
+from recording import readFrames
+from renderers.terminalRenderer import TerminalRenderer
+
+parser = argparse.ArgumentParser()
+parser.add_argument('-i', '--input', required=True, help='The recording to play (.cast is added)')
+parser.add_argument('--speed', type=float, default=1, help='Playback speed, 2 is twice as fast (default: 1)')
+parser.add_argument('--seek', type=float, default=0, metavar='SECONDS', help='Start this far into the recording')
+
+args = parser.parse_args()
+
+if args.speed <= 0:
+    parser.error('--speed must be positive')
+
+renderer = TerminalRenderer()
+start = None
+for seconds, frame in readFrames(args.input, args.seek):
+    if start is None:
+        start = time.perf_counter() - seconds / args.speed
+    delay = start + seconds / args.speed - time.perf_counter()
+    if delay > 0:
+        time.sleep(delay)
+    renderer.clear()
+    renderer.write(frame)
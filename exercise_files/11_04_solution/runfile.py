@@ -3,18 +3,100 @@ import argparse
 # Import these so that we can pass them to "fromFile" as globals
 from canvases.canvas import Canvas
 from canvases.canvasAxis import CanvasAxis 
+from canvases.toroidalCanvas import ToroidalCanvas
+from canvases.viewport import Viewport
 from scribes.plotScribe import PlotScribe 
+from scribes.implicitPlotScribe import ImplicitPlotScribe
 from scribes.randomScribe import RandomWalkScribe
 from scribes.robotScribe import RobotScribe
 from scribes.terminalScribe import TerminalScribe
+from profiling import Profiler
+from metrics import Metrics, serve
+from recording import Recorder
+from broadcast import Broadcaster
+from journal import Journal
+from renderers.fileRenderer import FileRenderer
+from renderers.nullRenderer import NullRenderer
+from renderers.socketRenderer import SocketRenderer
+from renderers.terminalRenderer import TerminalRenderer
 import scribes 
 
 parser = argparse.ArgumentParser()
 parser.add_argument('-i', '--input', required=True, help='The input Scribe file to run')
+parser.add_argument('--profile', nargs='?', const='profile', metavar='NAME', help='Time the run, print a summary and save it to NAME.json (default: profile.json)')
+parser.add_argument('--cprofile', action='store_true', help='With --profile, also capture cProfile stats to NAME.prof')
+parser.add_argument('--metrics-port', type=int, metavar='PORT', help='Serve Prometheus metrics at http://127.0.0.1:PORT/metrics while running')
+parser.add_argument('--metrics-host', default='127.0.0.1', help='Address to serve metrics on (default: 127.0.0.1)')
+parser.add_argument('--record', metavar='NAME', help='Record the rendered frames to NAME.cast, to play back with replay.py')
+parser.add_argument('--keyframe-interval', type=int, default=100, metavar='FRAMES', help='With --record, store a full frame this often (default: 100)')
+parser.add_argument('--output', default='terminal', metavar='TARGET', help='Where frames go: terminal (default), null, file:NAME (plain text in NAME.txt) or socket:HOST:PORT')
+parser.add_argument('--serve', type=int, metavar='PORT', help='Stream frames to clients on PORT, such as "python watch.py PORT"')
+parser.add_argument('--serve-host', default='127.0.0.1', help='Address to stream frames on (default: 127.0.0.1)')
+parser.add_argument('--viewport', action='store_true', help='Only render as much of the canvas as fits in the terminal')
+parser.add_argument('--offset', type=int, nargs=2, default=(0, 0), metavar=('X', 'Y'), help='With --viewport, the top left cell to show')
+parser.add_argument('--follow', type=int, metavar='INDEX', help='Keep scribe number INDEX in the middle of the viewport (implies --viewport)')
+parser.add_argument('--overview', choices=('majority', 'density', 'last'), help='Render a downsampled overview of the whole canvas, summarizing each block of cells by its most common glyph, how full it is, or the glyph drawn there last')
+parser.add_argument('--journal', metavar='NAME', help='Autosave the run to NAME.json and NAME.journal; running with -i NAME later carries on from the last save')
+parser.add_argument('--autosave', type=float, default=5, metavar='SECONDS', help='With --journal, how often to save (default: 5)')
+parser.add_argument('--compact-every', type=int, default=100, metavar='SAVES', help='With --journal, rewrite the full snapshot after this many saves (default: 100)')
 
 args = parser.parse_args()
+if args.cprofile and not args.profile:
+    parser.error('--cprofile requires --profile')
+
+# The renderer for an --output target
+def makeRenderer(target):
+    kind, _, rest = target.partition(':')
+    if kind == 'terminal':
+        return TerminalRenderer()
+    if kind == 'null':
+        return NullRenderer()
+    if kind == 'file' and rest:
+        return FileRenderer(rest)
+    if kind == 'socket' and rest:
+        host, _, port = rest.rpartition(':')
+        return SocketRenderer(host or '127.0.0.1', int(port))
+    parser.error(f'Unknown --output "{target}"')
 
 print(args.input)
 
 c = Canvas.fromFile(args.input, globals())
-c.go()
+c.renderer = makeRenderer(args.output)
+if args.viewport or args.follow is not None:
+    follow = None
+    if args.follow is not None:
+        if not 0 <= args.follow < len(c.scribes):
+            parser.error(f'--follow must be between 0 and {len(c.scribes) - 1}')
+        follow = c.scribes[args.follow]
+    c.viewport = Viewport(*args.offset, follow=follow)
+if args.overview:
+    c.buildPyramid()
+    c.overview = args.overview
+if args.profile:
+    c.profiler = Profiler(cprofile=args.cprofile)
+if args.metrics_port is not None:
+    c.metrics = Metrics()
+    serve(c, args.metrics_port, args.metrics_host)
+if args.record:
+    recorder = Recorder(args.record, c, args.keyframe_interval)
+    c.frameListeners.append(recorder)
+if args.journal:
+    journal = Journal(c, args.journal, args.autosave, args.compact_every)
+    c.frameListeners.append(journal)
+if args.serve is not None:
+    broadcaster = Broadcaster(args.serve, args.serve_host)
+    c.frameListeners.append(broadcaster)
+try:
+    c.go()
+finally:
+    if args.journal:
+        journal.close()
+    if args.record:
+        recorder.close()
+    if args.serve is not None:
+        broadcaster.close()
+    c.renderer.close()
+
+if args.profile:
+    print(c.profiler.summary())
+    c.profiler.toFile(args.profile)
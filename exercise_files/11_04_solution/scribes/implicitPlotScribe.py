@@ -0,0 +1,56 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from errors import TerminalScribeException
+from expressions import compileExpression
+from scribes.terminalScribe import TerminalScribe
+
+
+# Marching squares over a grid of f(x, y) values: the contour crosses every
+# grid edge whose two ends lie on opposite sides of f = 0, at the point found
+# by linear interpolation along that edge. Returns the (x, y) cells nearest
+# to those crossings, plus any cells where f is exactly 0.
+def contourCells(values):
+    with np.errstate(all='ignore'):
+        inside = values > 0
+        cells = [np.argwhere(values == 0)]
+
+        # Edges between (x, y) and (x+1, y)
+        v0, v1 = values[:-1, :], values[1:, :]
+        crosses = (inside[:-1, :] != inside[1:, :]) & ~np.isnan(v0) & ~np.isnan(v1)
+        xs, ys = np.nonzero(crosses)
+        t = v0[crosses] / (v0[crosses] - v1[crosses])
+        cells.append(np.column_stack((xs + (t > 0.5), ys)))
+
+        # Edges between (x, y) and (x, y+1)
+        v0, v1 = values[:, :-1], values[:, 1:]
+        crosses = (inside[:, :-1] != inside[:, 1:]) & ~np.isnan(v0) & ~np.isnan(v1)
+        xs, ys = np.nonzero(crosses)
+        t = v0[crosses] / (v0[crosses] - v1[crosses])
+        cells.append(np.column_stack((xs, ys + (t > 0.5))))
+
+    return np.unique(np.concatenate(cells), axis=0)
+
+
+class ImplicitPlotScribe(TerminalScribe):
+    __slots__ = ()
+
+    def __init__(self, **kwargs):
+        if np is None:
+            raise TerminalScribeException('ImplicitPlotScribe requires numpy')
+        super().__init__(**kwargs)
+
+    # Draws the curve f(x, y) = 0 over the whole canvas in a single move.
+    # expression is a string in x and y, such as '(x-20)**2 + (y-20)**2 - 100'
+    def _plot(self, expression, canvas):
+        function = compileExpression(expression, ('x', 'y'))
+        xs, ys = np.meshgrid(np.arange(canvas._x), np.arange(canvas._y), indexing='ij')
+        values = np.broadcast_to(np.asarray(function(xs, ys), dtype=float), xs.shape)
+        for cx, cy in contourCells(values).tolist():
+            canvas.setCell(cx, cy, self.trail)
+
+    def plot(self, expression):
+        compileExpression(expression, ('x', 'y'))
+        self.moves.append((self._plot, [expression]))
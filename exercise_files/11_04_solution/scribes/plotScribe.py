@@ -1,6 +1,48 @@
+import math
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from expressions import compileExpression
 from scribes.terminalScribe import TerminalScribe
 
+
+# function(x), or None where plain Python arithmetic fails
+def samplePoint(function, x):
+    try:
+        return function(x)
+    except (ValueError, ZeroDivisionError, OverflowError):
+        return None
+
+
+# Samples function at every integer x in [start, stop), shared by all scribes.
+# Functions written with NumPy-compatible operations are evaluated over the
+# whole domain in one call; anything else, including functions that return
+# None or some other non-numeric result for the array, is evaluated point
+# by point.
+# Points where the function is undefined (None, NaN or infinite) are
+# returned as None.
+@lru_cache(maxsize=64)
+def sampleFunction(function, start, stop):
+    if np is not None:
+        xs = np.arange(start, stop)
+        try:
+            with np.errstate(all='ignore'):
+                ys = np.asarray(function(xs))
+            if ys.dtype.kind in 'biuf' and ys.shape in ((), xs.shape):
+                ys = ys.astype(float)
+                return tuple(None if not math.isfinite(y) else y for y in np.broadcast_to(ys, xs.shape).tolist())
+        except (TypeError, ValueError):
+            pass
+    ys = (samplePoint(function, x) for x in range(start, stop))
+    return tuple(None if y is None or not math.isfinite(y) else y for y in ys)
+
+
 class PlotScribe(TerminalScribe):
+    __slots__ = ('x', 'domain')
 
     def __init__(self, domain, **kwargs):
         self.x = domain[0]
@@ -13,6 +55,15 @@ class PlotScribe(TerminalScribe):
         data['domain'] = self.domain
         return data
 
+    def runState(self):
+        state = super().runState()
+        state['x'] = self.x
+        return state
+
+    def setRunState(self, state):
+        super().setRunState(state)
+        self.x = state['x']
+
     def fromDict(data, g):
         scribe = g[data.get('classname')](
             color=data.get('color'),
@@ -22,15 +73,25 @@ class PlotScribe(TerminalScribe):
             domain=data.get('domain'),
         )
         scribe.x = data.get('x')
+        scribe.moves = scribe._movesFromDict(data.get('moves'))
         return scribe
 
+    # function is either a callable or an expression string in x, such as
+    # '5*sin(x/4) + 15'. Strings are stored as-is in the moves so that plots
+    # can be saved with toFile and loaded again with fromFile
     def _plotX(self, function, canvas):
-        pos = [self.x, function(self.x)]
-        if not canvas.hitsWall(pos):
-            self.draw(pos, canvas)
+        if isinstance(function, str):
+            function = compileExpression(function)
+        samples = sampleFunction(function, self.domain[0], self.domain[1])
+        i = self.x - self.domain[0]
+        y = samples[i] if 0 <= i < len(samples) else function(self.x)
+        if y is not None and not canvas.hitsWall((self.x, y)):
+            self.draw((self.x, y), canvas)
         self.x = self.x + 1
 
     def plotX(self, function):
+        if isinstance(function, str):
+            compileExpression(function)
         self.x = self.domain[0]
         for x in range(self.domain[0], self.domain[1]):
             self.moves.append((self._plotX, [function]))
\ No newline at end of file
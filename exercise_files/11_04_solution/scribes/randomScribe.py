@@ -1,28 +1,153 @@
+import copy
+import logging
+import math
 import random
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from errors import TerminalScribeException
 from scribes.terminalScribe import TerminalScribe
 
+logger = logging.getLogger(__name__)
+
 class RandomWalkScribe(TerminalScribe):
-    def __init__(self, **kwargs):
+    __slots__ = ('degrees', 'seed', 'blockSize', '_rng', '_blocks', '_offsets', '_cos', '_sin', '_step', '_base', '_sign', '_cosBase', '_sinBase')
+
+    # With a seed, degree changes are drawn blockSize at a time from a
+    # numpy.random.Generator and the walk replays exactly. Without one the
+    # walk uses the global random module.
+    def __init__(self, seed=None, blockSize=1024, **kwargs):
         super().__init__(**kwargs)
         self.degrees = kwargs.get('degrees', 135)
-    
+        self.blockSize = blockSize
+        self.reseed(seed)
+
+    # seed is anything numpy.random.default_rng accepts, or None for the
+    # global random module
+    def reseed(self, seed):
+        self.seed = seed
+        self._rng = None
+        if seed is not None:
+            if np is None:
+                raise TerminalScribeException('A seeded RandomWalkScribe requires numpy')
+            self._rng = np.random.default_rng(seed)
+            self._blocks = 0
+            self._offsets = []
+            self._step = 0
+            self._rebase(self.degrees, 1)
+
+    def toDict(self):
+        data = super().toDict()
+        data['seed'] = self.seed
+        data['blockSize'] = self.blockSize
+        return data
+
+    def fromDict(data, g):
+        scribe = g[data.get('classname')](
+            color=data.get('color'),
+            mark=data.get('mark'),
+            trail=data.get('trail'),
+            pos=data.get('pos'),
+            seed=data.get('seed'),
+            blockSize=data.get('blockSize', 1024),
+        )
+        scribe.moves = scribe._movesFromDict(data.get('moves'))
+        return scribe
+
+    # A seeded walk's random stream is restored by drawing the same number
+    # of blocks again from a fresh generator
+    def runState(self):
+        state = super().runState()
+        state['degrees'] = self.degrees
+        if self._rng is not None:
+            state.update(blocks=self._blocks, step=self._step, base=self._base, sign=self._sign)
+        return state
+
+    def setRunState(self, state):
+        self.degrees = state['degrees']
+        if self._rng is not None and 'blocks' in state:
+            self.reseed(self.seed)
+            for i in range(state['blocks']):
+                self._drawBlock()
+            self._step = state['step']
+            self._setBase(state['base'], state['sign'])
+        super().setRunState(state)
+
+    def clone(self):
+        scribe = super().clone()
+        if self._rng is not None:
+            scribe._rng = copy.deepcopy(self._rng)
+        return scribe
+
+    def _setDegrees(self, degrees, _):
+        super()._setDegrees(degrees, _)
+        self.degrees = degrees
+        if self._rng is not None:
+            self._rebase(degrees, 1)
+
+    # The walk's heading is _base + _sign * offset, where the offsets are the
+    # running totals of the current block of random changes. Bounces only
+    # change _base and _sign, so the block (and the sines and cosines of its
+    # offsets) stays valid and each step is a little arithmetic.
+    def _rebase(self, base, sign):
+        offset = self._offsets[self._step - 1] if self._step else 0
+        self._setBase(base - sign * offset, sign)
+
+    def _setBase(self, base, sign):
+        self._base = base
+        self._sign = sign
+        radians = math.radians(self._base)
+        self._cosBase = math.cos(radians)
+        self._sinBase = math.sin(radians)
+
+    def _drawBlock(self):
+        self._blocks += 1
+        offsets = np.cumsum(self._rng.integers(-10, 11, size=self.blockSize))
+        radians = np.radians(offsets)
+        self._offsets = offsets.tolist()
+        self._cos = np.cos(radians).tolist()
+        self._sin = np.sin(radians).tolist()
+        self._step = 0
+        self._rebase(self.degrees, 1)
+
+    def _nextDegrees(self):
+        if self._step == len(self._offsets):
+            self._drawBlock()
+        i = self._step
+        self._step += 1
+        cosOffset = self._cos[i]
+        sinOffset = self._sign * self._sin[i]
+        self.degrees = self._base + self._sign * self._offsets[i]
+        sin = self._sinBase * cosOffset + self._cosBase * sinOffset
+        cos = self._cosBase * cosOffset - self._sinBase * sinOffset
+        self.direction = (sin, -cos)
+
     def _randomizeDegrees(self, _):
-        self.degrees = random.randint(self.degrees-10, self.degrees+10)
-        self.direction = self.degreesToUnitDirection(self.degrees)
-        print(f'Degrees is {self.degrees}')
+        if self._rng is None:
+            self.degrees = random.randint(self.degrees-10, self.degrees+10)
+            self.direction = self.degreesToUnitDirection(self.degrees)
+        else:
+            self._nextDegrees()
+        logger.debug('Degrees is %s', self.degrees)
 
     def randomizeDegrees(self):
         self.moves.append((self._randomizeDegrees, []))
-    
-    def bounce(self, pos, canvas):
-        reflection = canvas.getReflection(pos)
+
+    def reflect(self, reflection):
         if reflection[0] == -1:
             self.degrees = 360 - self.degrees
+            if self._rng is not None:
+                self._rebase(self.degrees, -self._sign)
         if reflection[1] == -1:
             self.degrees = 180 - self.degrees
-        self.direction = [self.direction[0] * reflection[0], self.direction[1] * reflection[1]]
+            if self._rng is not None:
+                self._rebase(self.degrees, -self._sign)
+        self.direction = (self.direction[0] * reflection[0], self.direction[1] * reflection[1])
 
     def forward(self, distance=1):
         for i in range(distance):
             self.randomizeDegrees()
-            super().forward()
\ No newline at end of file
+            super().forward()
@@ -1,25 +1,67 @@
+from errors import InvalidParameter
 from scribes.terminalScribe import TerminalScribe
 
 class RobotScribe(TerminalScribe):
-    def up(self, distance=1):
-        self.setDirection([0, -1])
-        self.forward(distance)
+    __slots__ = ()
 
-    def down(self, distance=1):
-        self.setDirection([0, 1])
-        self.forward(distance)
+    # A whole straight side in one move. Sides that stay on the canvas are
+    # drawn with Canvas.hline/vline; any other goes through _lineTo, so it
+    # bounces off the walls or, on a ToroidalCanvas, wraps round the edges.
+    def _line(self, direction, distance, canvas):
+        self.direction = direction
+        x = self._cx + direction[0] * distance
+        y = self._cy + direction[1] * distance
+        if not (0 <= x < canvas._x and 0 <= y < canvas._y):
+            self._lineTo(x, y, canvas)
+            return
+        if direction[1] == 0:
+            canvas.hline(self._cx, x, y, self.trail)
+        else:
+            canvas.vline(x, self._cy, y, self.trail)
+        self.pos = (x, y)
+        canvas.setCell(x, y, self._markCell)
 
-    def right(self, distance=1):
-        self.setDirection([1, 0])
+    def _move(self, direction, distance, asSegment):
+        if asSegment:
+            self.moves.append((self._line, [direction, distance]))
+            return
+        self.setDirection(direction)
         self.forward(distance)
 
-    def left(self, distance=1):
-        self.setDirection([-1, 0])
-        self.forward(distance)
+    def up(self, distance=1, asSegment=False):
+        self._move((0, -1), distance, asSegment)
+
+    def down(self, distance=1, asSegment=False):
+        self._move((0, 1), distance, asSegment)
+
+    def right(self, distance=1, asSegment=False):
+        self._move((1, 0), distance, asSegment)
+
+    def left(self, distance=1, asSegment=False):
+        self._move((-1, 0), distance, asSegment)
+
+    # The whole rectangle in one move, ending back on the starting corner
+    def _rect(self, width, height, fill, canvas):
+        corners = (self._cx, self._cy, self._cx + width, self._cy + height)
+        if fill:
+            canvas.fillRect(*corners, self.trail)
+        else:
+            canvas.strokeRect(*corners, self.trail)
+        canvas.setCell(self._cx, self._cy, self._markCell)
 
-    def drawSquare(self, size):
-        self.right(size)
-        self.down(size)
-        self.left(size)
-        self.up(size)
+    # By default rectangles are drawn a cell per move, as before. With
+    # asSegment each side is a single move, and with instant the whole
+    # rectangle is one. Filled rectangles can only be drawn instantly.
+    def drawRect(self, width, height, fill=False, asSegment=False, instant=False):
+        if fill and not instant:
+            raise InvalidParameter('Filled rectangles must be drawn with instant=True')
+        if instant:
+            self.moves.append((self._rect, [width, height, fill]))
+            return
+        self.right(width, asSegment)
+        self.down(height, asSegment)
+        self.left(width, asSegment)
+        self.up(height, asSegment)
 
+    def drawSquare(self, size, asSegment=False, instant=False):
+        self.drawRect(size, size, asSegment=asSegment, instant=instant)
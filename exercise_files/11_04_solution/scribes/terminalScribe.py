@@ -1,17 +1,30 @@
 from termcolor import colored, COLORS
+import copy
 import math 
+from functools import lru_cache
 from inspect import getmembers, ismethod
 
 from errors import InvalidParameter 
-from utils import is_number 
+from raster import bresenham, arcCells, bezierPolyline, heading
+from utils import is_number, cell_index
+
+# Scribes sharing a mark and color share a single colored string
+@lru_cache(maxsize=None)
+def coloredMark(mark, color):
+    return colored(mark, color)
 
 
 class TerminalScribe:
+    # Fixed attribute layout keeps idle scribes small (no per-instance __dict__).
+    # Position and direction are stored as plain floats and exposed as tuples,
+    # _cx/_cy cache the canvas cell of the current position.
+    __slots__ = ('moves', 'color', 'mark', 'trail', '_markCell', '_px', '_py', '_cx', '_cy', '_dx', '_dy')
+
     def __init__(self, color='red', mark='*', trail='.', pos=(0, 0), degrees=135):
         self.moves = []
 
         if color not in COLORS:
-            raise InvalidParameter(f'color {self.color} not a valid color ({", ".join(list(COLORS.keys()))})')
+            raise InvalidParameter(f'color {color} not a valid color ({", ".join(list(COLORS.keys()))})')
         self.color=color
 
         if len(str(mark)) != 1:
@@ -21,6 +34,7 @@ class TerminalScribe:
         if len(str(trail)) != 1:
             raise InvalidParameter('Trail must be a single character')
         self.trail = str(trail)
+        self._markCell = coloredMark(self.mark, self.color)
         
         if len(pos) != 2 or not is_number(pos[0])or not is_number(pos[1]):
             raise InvalidParameter('Position must be two numeric values (x, y)')
@@ -28,8 +42,27 @@ class TerminalScribe:
         
         if not is_number(degrees):
             raise InvalidParameter('Degrees must be a valid number')
+        self.direction = self.degreesToUnitDirection(degrees)
         self.setDegrees(degrees)
 
+    @property
+    def pos(self):
+        return (self._px, self._py)
+
+    @pos.setter
+    def pos(self, pos):
+        self._px, self._py = pos
+        self._cx = cell_index(self._px)
+        self._cy = cell_index(self._py)
+
+    @property
+    def direction(self):
+        return (self._dx, self._dy)
+
+    @direction.setter
+    def direction(self, direction):
+        self._dx, self._dy = direction
+
     def toDict(self):
         return {
             'classname': type(self).__name__,
@@ -37,9 +70,24 @@ class TerminalScribe:
             'mark': self.mark,
             'trail': self.trail,
             'pos': self.pos,
+            'state': self.runState(),
             'moves': [[move[0].__name__, move[1]] for move in self.moves]
         }
 
+    # What changes as the moves run, for saving a scribe part way through
+    def runState(self):
+        return {'pos': self.pos, 'direction': self.direction}
+
+    def setRunState(self, state):
+        self.pos = tuple(state['pos'])
+        self.direction = tuple(state['direction'])
+
+    # A copy with its own moves, bound to the copy
+    def clone(self):
+        scribe = copy.copy(self)
+        scribe.moves = [(getattr(scribe, move[0].__name__), move[1]) for move in self.moves]
+        return scribe
+
     def fromDict(data, g):
         scribe = g[data.get('classname')](
             color=data.get('color'),
@@ -68,7 +116,7 @@ class TerminalScribe:
 
     def degreesToUnitDirection(self, degrees):
         radians = (degrees/180) * math.pi 
-        return [math.sin(radians), -math.cos(radians)]
+        return math.sin(radians), -math.cos(radians)
 
     def _setDegrees(self, degrees, _):
         self.direction = self.degreesToUnitDirection(degrees)
@@ -77,21 +125,125 @@ class TerminalScribe:
         self.moves.append((self._setDegrees, [degrees]))
 
     def bounce(self, pos, canvas):
-        reflection = canvas.getReflection(pos)
-        self.direction = [self.direction[0] * reflection[0], self.direction[1] * reflection[1]]
+        self.reflect(canvas.getReflection(pos))
 
-    def _forward(self, canvas):
-        pos = [self.pos[0] + self.direction[0], self.pos[1] + self.direction[1]]
-        if canvas.hitsWall(pos):
-            self.bounce(pos, canvas)
-            pos = [self.pos[0] + self.direction[0], self.pos[1] + self.direction[1]]
-        self.draw(pos, canvas)
+    # reflection is a pair of 1/-1 factors for the x and y directions
+    def reflect(self, reflection):
+        self.direction = (self.direction[0] * reflection[0], self.direction[1] * reflection[1])
 
-    def forward(self, distance=1):
+    # A step that doesn't hit a wall allocates nothing: position, cell and
+    # direction live in float/int slots and the colored mark is precomputed
+    def _forward(self, canvas):
+        x = self._px + self._dx
+        y = self._py + self._dy
+        cx = cell_index(x)
+        cy = cell_index(y)
+        if canvas.hitsWallCell(cx, cy):
+            self.bounce((x, y), canvas)
+            x = self._px + self._dx
+            y = self._py + self._dy
+            cx = cell_index(x)
+            cy = cell_index(y)
+        canvas.setCell(self._cx, self._cy, self.trail)
+        self._px = x
+        self._py = y
+        self._cx = cx
+        self._cy = cy
+        canvas.setCell(cx, cy, self._markCell)
+
+    # Draws the straight line to (x, y) in a single move. Parts of the line
+    # beyond the canvas are folded back off the walls like bounced steps.
+    def _lineTo(self, x, y, canvas):
+        endX, endY, flipX, flipY = canvas.foldPoint(x, y)
+        for cx, cy in bresenham(self._cx, self._cy, cell_index(x), cell_index(y)):
+            cx, cy, _, _ = canvas.foldPoint(cx, cy)
+            canvas.setCell(cx, cy, self.trail)
+        self.pos = (endX, endY)
+        canvas.setCell(self._cx, self._cy, self._markCell)
+        if flipX or flipY:
+            self.direction = (-self._dx if flipX else self._dx, -self._dy if flipY else self._dy)
+
+    def lineTo(self, x, y):
+        self.moves.append((self._lineTo, [x, y]))
+
+    def _segment(self, distance, canvas):
+        self._lineTo(self._px + self._dx * distance, self._py + self._dy * distance, canvas)
+
+    # Draws the trail over cells (clipped to the canvas) and finishes the
+    # move at pos, heading in degrees
+    def _stroke(self, cells, pos, degrees, canvas):
+        canvas.setCell(self._cx, self._cy, self.trail)
+        for cx, cy in cells:
+            if not canvas.hitsWallCell(cx, cy):
+                canvas.setCell(cx, cy, self.trail)
+        x, y, _, _ = canvas.foldPoint(*pos)
+        self.pos = (x, y)
+        speed = math.hypot(self._dx, self._dy) or 1
+        self._dx, self._dy = (speed * d for d in self.degreesToUnitDirection(degrees))
+        canvas.setCell(self._cx, self._cy, self._markCell)
+
+    # Circular arc of the given radius, turning right (clockwise) for a
+    # positive sweep in degrees and left for a negative one. The cells come
+    # from the midpoint circle algorithm and the whole arc is a single move.
+    def _arc(self, radius, sweep, canvas):
+        facing = heading(self._dx, self._dy)
+        side = 90 if sweep >= 0 else -90
+        offsetX, offsetY = self.degreesToUnitDirection(facing + side)
+        centerX = self._px + radius * offsetX
+        centerY = self._py + radius * offsetY
+        start = facing - side
+        end = math.radians(start + sweep)
+        cells = arcCells(cell_index(centerX), cell_index(centerY), cell_index(radius), start, sweep)
+        pos = (centerX + radius * math.sin(end), centerY - radius * math.cos(end))
+        self._stroke(cells, pos, facing + sweep, canvas)
+
+    def arc(self, radius, sweep):
+        self.moves.append((self._arc, [radius, sweep]))
+
+    # Bezier curve from the current position through the control points to
+    # the last point: bezierTo(control, end) is quadratic and
+    # bezierTo(control1, control2, end) cubic. The curve is subdivided until
+    # each piece is flat and the pieces are joined with Bresenham lines.
+    def _bezierTo(self, points, canvas):
+        points = [self.pos] + [tuple(point) for point in points]
+        polyline = [(cell_index(x), cell_index(y)) for x, y in bezierPolyline(points)]
+        cells = [polyline[0]]
+        for (x0, y0), (x1, y1) in zip(polyline, polyline[1:]):
+            cells.extend(list(bresenham(x0, y0, x1, y1))[1:])
+        # Leave heading along the curve's end tangent
+        x1, y1 = points[-1]
+        x0, y0 = next((point for point in reversed(points) if point != points[-1]), points[-1])
+        self._stroke(cells, points[-1], heading(x1 - x0, y1 - y0), canvas)
+
+    def bezierTo(self, *points):
+        self.moves.append((self._bezierTo, [list(points)]))
+
+    # Draws a prebuilt block of glyphs with its top left corner at the
+    # scribe's position; spaces in the sprite are transparent
+    def _stamp(self, sprite, canvas):
+        canvas.blit(self._cx, self._cy, sprite, transparent=' ')
+
+    def stamp(self, sprite):
+        self.moves.append((self._stamp, [sprite]))
+
+    # Flood fills the region around pos in one move, by default with the
+    # scribe's trail in the scribe's color
+    def _fill(self, pos, mark, color, canvas):
+        canvas.floodFill(pos, mark or self.trail, color or self.color)
+
+    def fill(self, pos, mark=None, color=None):
+        self.moves.append((self._fill, [pos, mark, color]))
+
+    # With asSegment the whole distance is drawn as one move instead of one
+    # move per unit step
+    def forward(self, distance=1, asSegment=False):
+        if asSegment:
+            self.moves.append((self._segment, [distance]))
+            return
         for i in range(distance):
             self.moves.append((self._forward, []))
 
     def draw(self, pos, canvas):
-        canvas.setPos(self.pos, self.trail)
+        canvas.setCell(self._cx, self._cy, self.trail)
         self.pos = pos
-        canvas.setPos(self.pos, colored(self.mark, self.color))
\ No newline at end of file
+        canvas.setCell(self._cx, self._cy, self._markCell)
@@ -3,4 +3,15 @@ def is_number(val):
         float(val)
         return True
     except ValueError:
-        return False
\ No newline at end of file
+        return False
+
+# Same result as round(value), but int() and float arithmetic avoid the
+# __round__ lookup round() allocates a bound method for on every call
+def cell_index(value):
+    cell = int(value)
+    if cell > value:
+        cell -= 1
+    fraction = value - cell
+    if fraction > 0.5 or (fraction == 0.5 and cell & 1):
+        cell += 1
+    return cell
@@ -0,0 +1,15 @@
+import argparse
+
+from broadcast import receiveFrames
+from renderers.terminalRenderer import TerminalRenderer
+
+parser = argparse.ArgumentParser()
+parser.add_argument('port', type=int, help='Port of a runfile.py --serve')
+parser.add_argument('--host', default='127.0.0.1')
+
+args = parser.parse_args()
+
+renderer = TerminalRenderer()
+for frame in receiveFrames(args.host, args.port):
+    renderer.clear()
+    renderer.write(frame)